@@ -10,12 +10,16 @@ LOCAL_MODEL_DIR="${LOCAL_MODEL_DIR:-models/cxiu_blip_baseline}"
 GCS_MODEL_URI="${GCS_MODEL_URI:-}"
 ALLOW_HF_FALLBACK="${ALLOW_HF_FALLBACK:-false}"
 PORT="${PORT:-8080}"
+WEB_CONCURRENCY="${WEB_CONCURRENCY:-1}"
+MODEL_DOWNLOAD_IN_APP="${MODEL_DOWNLOAD_IN_APP:-false}"
 
 echo "[entrypoint] MODEL_FAMILY        = ${MODEL_FAMILY}"
 echo "[entrypoint] LOCAL_MODEL_DIR    = ${LOCAL_MODEL_DIR}"
 echo "[entrypoint] GCS_MODEL_URI      = ${GCS_MODEL_URI:-<empty>}"
 echo "[entrypoint] ALLOW_HF_FALLBACK  = ${ALLOW_HF_FALLBACK}"
 echo "[entrypoint] PORT               = ${PORT}"
+echo "[entrypoint] WEB_CONCURRENCY    = ${WEB_CONCURRENCY}"
+echo "[entrypoint] MODEL_DOWNLOAD_IN_APP = ${MODEL_DOWNLOAD_IN_APP}"
 
 # If ADC was mounted but GOOGLE_APPLICATION_CREDENTIALS not set, set it.
 if [[ -z "${GOOGLE_APPLICATION_CREDENTIALS:-}" ]]; then
@@ -31,23 +35,33 @@ else
 fi
 
 echo "[entrypoint] Step 1/2: Optional GCS model download..."
-if [[ -n "${GCS_MODEL_URI}" ]]; then
-  echo "[entrypoint] GCS_MODEL_URI set -> downloading from bucket"
-  python -m xplain_package.io.gcs
+if [[ -n "${GCS_MODEL_URI}" && "${MODEL_DOWNLOAD_IN_APP}" == "true" ]]; then
+  # The API downloads in a background thread (overlaps startup);
+  # /ready reports 503 until the model is downloaded AND loaded.
+  echo "[entrypoint] MODEL_DOWNLOAD_IN_APP=true -> download happens inside the API process"
 else
-  echo "[entrypoint] No GCS_MODEL_URI set -> skipping download."
-fi
+  if [[ -n "${GCS_MODEL_URI}" ]]; then
+    echo "[entrypoint] GCS_MODEL_URI set -> downloading from bucket"
+    python -m xplain_package.io.gcs
+  else
+    echo "[entrypoint] No GCS_MODEL_URI set -> skipping download."
+  fi
 
-echo "[entrypoint] Verifying local model folder..."
-if [[ ! -d "${LOCAL_MODEL_DIR}" ]]; then
-  echo "[entrypoint] ERROR: LOCAL_MODEL_DIR does not exist after download: ${LOCAL_MODEL_DIR}" >&2
-  exit 1
-fi
-if [[ ! -f "${LOCAL_MODEL_DIR}/config.json" ]]; then
-  echo "[entrypoint] ERROR: Missing config.json in ${LOCAL_MODEL_DIR}. Not a valid HF model folder." >&2
-  exit 1
+  echo "[entrypoint] Verifying local model folder..."
+  if [[ ! -d "${LOCAL_MODEL_DIR}" ]]; then
+    echo "[entrypoint] ERROR: LOCAL_MODEL_DIR does not exist after download: ${LOCAL_MODEL_DIR}" >&2
+    exit 1
+  fi
+  if [[ ! -f "${LOCAL_MODEL_DIR}/config.json" ]]; then
+    echo "[entrypoint] ERROR: Missing config.json in ${LOCAL_MODEL_DIR}. Not a valid HF model folder." >&2
+    exit 1
+  fi
+  echo "[entrypoint] Local model OK: ${LOCAL_MODEL_DIR}/config.json"
 fi
-echo "[entrypoint] Local model OK: ${LOCAL_MODEL_DIR}/config.json"
 
 echo "[entrypoint] Step 2/2: Starting FastAPI..."
+if [[ "${WEB_CONCURRENCY}" -gt 1 ]]; then
+  # Multi-worker: each worker loads the model in its own startup (post-fork)
+  exec bash scripts/run_gunicorn.sh
+fi
 exec uvicorn api.fast:app --host 0.0.0.0 --port "${PORT}"
@@ -0,0 +1,23 @@
+#!/usr/bin/env bash
+# ============================================================
+# run_gunicorn.sh
+#
+# Multi-worker FastAPI server (1 worker = 1 process = 1 model copy).
+#
+# - WEB_CONCURRENCY sets the number of workers (default 1)
+# - NO --preload: the model is loaded in each worker's startup
+#   event, AFTER fork (torch/CUDA state is not fork-safe)
+# - Long timeout: first startup may download / load a large model
+# ============================================================
+set -euo pipefail
+
+PORT="${PORT:-8080}"
+WEB_CONCURRENCY="${WEB_CONCURRENCY:-1}"
+
+echo "[gunicorn] Starting ${WEB_CONCURRENCY} worker(s) on port ${PORT}"
+
+exec gunicorn api.fast:app \
+  -k uvicorn.workers.UvicornWorker \
+  -w "${WEB_CONCURRENCY}" \
+  --bind "0.0.0.0:${PORT}" \
+  --timeout 300
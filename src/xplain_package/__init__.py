@@ -12,11 +12,15 @@ from xplain_package.inference.predict import (
     predict_caption,
     predict_captions,
     load_captioner,
+    is_loaded,
 )
+from xplain_package.inference.batching import MicroBatcher
 
 # Declare public API
 __all__ = [
     "predict_caption",
     "predict_captions",
     "load_captioner",
+    "is_loaded",
+    "MicroBatcher",
 ]
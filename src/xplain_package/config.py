@@ -12,6 +12,7 @@ Design goals:
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 
@@ -37,10 +38,88 @@ class Settings:
     # HF fallback gate (default false for offline safety)
     ALLOW_HF_FALLBACK: bool = os.getenv("ALLOW_HF_FALLBACK", "false").lower() == "true"
 
+    # Download GCS_MODEL_URI inside the API process (background thread)
+    # instead of in the entrypoint: the server starts right away and the
+    # download overlaps CUDA init. /ready stays 503 until loaded.
+    MODEL_DOWNLOAD_IN_APP: bool = os.getenv("MODEL_DOWNLOAD_IN_APP", "false").lower() == "true"
+
     # --- inference ---
     DEVICE: str = os.getenv("DEVICE", "auto")  # auto | cpu | cuda
     MAX_NEW_TOKENS: int = int(os.getenv("MAX_NEW_TOKENS", "80"))
-    BEAM_SIZE: int = int(os.getenv("BEAM_SIZE", "3"))
+    BEAM_SIZE: int = int(os.getenv("BEAM_SIZE", "1"))
+
+    # Decoding strategy: greedy | beam | sample
+    # - greedy: 1 beam, deterministic, fastest (~3x faster decode than 3 beams)
+    # - beam:   BEAM_SIZE beams (at least 2), deterministic, slower
+    # - sample: nucleus sampling with TOP_P, NOT deterministic (no caching)
+    GENERATION_MODE: str = os.getenv("GENERATION_MODE", "greedy").lower()
+    TOP_P: float = float(os.getenv("TOP_P", "0.9"))
+
+    # Numeric precision on GPU: auto | fp32 | fp16 | bf16
+    # auto = bf16 on Ampere+ GPUs, fp16 on older GPUs, fp32 on CPU
+    PRECISION: str = os.getenv("PRECISION", "auto").lower()
+
+    # Weight quantization: none | int8 | int4
+    # CPU -> torch dynamic int8 on Linear layers (int4 falls back to int8)
+    # GPU -> bitsandbytes 8-bit / 4-bit (requires bitsandbytes installed)
+    QUANTIZATION: str = os.getenv("QUANTIZATION", "none").lower()
+
+    # Which weights QUANTIZATION applies to: all | text_decoder
+    # text_decoder = only the decoder (bandwidth-bound during generation);
+    # the vision encoder stays in full / half precision.
+    QUANTIZE_TARGET: str = os.getenv("QUANTIZE_TARGET", "all").lower()
+
+    # Vision encoder backend: pytorch | tensorrt
+    # tensorrt builds + caches an fp16 engine under ENGINE_CACHE_DIR
+    BACKEND: str = os.getenv("BACKEND", "pytorch").lower()
+
+    # Where TensorRT engines are cached. Kept OUT of LOCAL_MODEL_DIR:
+    # that folder is model content (GCS sync / manifest).
+    ENGINE_CACHE_DIR: str = os.getenv("ENGINE_CACHE_DIR", "engine_cache")
+
+    # Opt-in: replay the vision encoder as a CUDA graph for batch=1 requests.
+    # Only active on CUDA with greedy decoding (GENERATION_MODE=greedy).
+    CUDA_GRAPHS: bool = os.getenv("CUDA_GRAPHS", "false").lower() == "true"
+
+    # Also replay the greedy decode loop as a CUDA graph for batch=1
+    # (fixed-length, no-KV-cache decoder forward per step). Experimental:
+    # only kept if it matches generate() and is faster at startup.
+    DECODE_CUDA_GRAPH: bool = os.getenv("DECODE_CUDA_GRAPH", "false").lower() == "true"
+
+    # CUDA only: compile the vision encoder with torch.compile (TorchInductor).
+    # Adds a one-time compile at startup; replaces CUDA_GRAPHS when enabled.
+    TORCH_COMPILE: bool = os.getenv("TORCH_COMPILE", "false").lower() == "true"
+
+    # Shared TorchInductor cache (e.g. a GCS FUSE mount or persistent disk).
+    # Workers / replicas reuse compiled kernels instead of recompiling.
+    # Empty = torch default (per-container /tmp).
+    INDUCTOR_CACHE_DIR: str = os.getenv("INDUCTOR_CACHE_DIR", "")
+
+    # Run one dummy caption at startup (cuDNN autotune, CUDA context,
+    # lazy kernel init) so the first real request is not the slow one
+    WARMUP: bool = os.getenv("WARMUP", "true").lower() == "true"
+
+    # CPU only: fused Numba rescale + normalize + transpose kernel
+    # (falls back to numpy if numba is not installed)
+    FAST_PREPROC: bool = os.getenv("FAST_PREPROC", "true").lower() == "true"
+
+    # Number of captions kept in memory, keyed by image content hash.
+    # 0 disables the cache.
+    CAPTION_CACHE_SIZE: int = int(os.getenv("CAPTION_CACHE_SIZE", "1024"))
+
+    # Number of preprocessed pixel tensors kept in RAM (by content hash).
+    # Small on purpose (~1.7 MB each at 384x384). 0 disables the cache.
+    PIXEL_CACHE_SIZE: int = int(os.getenv("PIXEL_CACHE_SIZE", "64"))
+
+    # --- server-side micro-batching (/predict) ---
+    # Requests arriving within MAX_WAIT_MS are merged into one generate call
+    MAX_BATCH: int = int(os.getenv("MAX_BATCH", "16"))
+    MAX_WAIT_MS: float = float(os.getenv("MAX_WAIT_MS", "10"))
+
+    # --- serving ---
+    # Number of server worker processes (gunicorn / uvicorn convention).
+    # Each worker loads its own model copy after fork.
+    WORKERS: int = int(os.getenv("WEB_CONCURRENCY", "1"))
 
     # --- misc ---
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -50,6 +129,12 @@ class Settings:
 settings = Settings()
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Backward-compatible accessor."""
+    """
+    Backward-compatible accessor.
+
+    Always returns the import-time singleton (env is read once);
+    lru_cache keeps it a constant-time call even on hot paths.
+    """
     return settings
@@ -0,0 +1,53 @@
+"""
+_fast.py
+
+Compiled CPU kernels for image preprocessing.
+
+When inference runs on CPU, converting resized uint8 HWC pixels into
+normalized float32 CHW tensors is a hot loop. Doing it with separate
+numpy ops creates several full-size temporaries (cast, rescale,
+normalize, transpose). The Numba kernel below does all of it in ONE
+parallel pass:
+
+    out[c, y, x] = u8[y, x, c] * scale[c] + shift[c]
+
+with scale = rescale_factor / std and shift = -mean / std.
+
+Numba is optional: without it we fall back to an equivalent numpy
+version (same results, just slower).
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def normalize_u8_to_f32(arr, scale, shift, out):
+        """
+        Fused uint8 HWC -> normalized float32 CHW, written into `out`.
+
+        arr   : uint8   (H, W, C)
+        scale : float32 (C,)
+        shift : float32 (C,)
+        out   : float32 (C, H, W)
+        """
+        height, width, channels = arr.shape
+        for y in prange(height):
+            for x in range(width):
+                for c in range(channels):
+                    out[c, y, x] = arr[y, x, c] * scale[c] + shift[c]
+
+else:
+
+    def normalize_u8_to_f32(arr, scale, shift, out):
+        """numpy fallback with the same contract as the Numba kernel."""
+        np.multiply(arr.transpose(2, 0, 1), scale[:, None, None], out=out)
+        out += shift[:, None, None]
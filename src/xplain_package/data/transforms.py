@@ -8,19 +8,30 @@ For the BLIP baseline, we do not need manual normalization here because:
 
 So this file is intentionally simple:
 - load_image(path) -> returns a clean RGB PIL image
+- TensorImagePipeline -> batched torch version of the processor's
+  resize + normalize (built by BlipCaptioner, used on the hot path)
 
 Later, if a new model needs custom preprocessing,
 this is the first place to update.
 """
 
+import threading
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
 # PIL (Python Imaging Library) is the standard way to handle images
 from PIL import Image
 
 # Our own exception type for cleaner errors upstream
 from xplain_package.utils.exceptions import InvalidInputError
 
+# Fused uint8 -> normalized float32 kernel (Numba, numpy fallback)
+from xplain_package.data._fast import normalize_u8_to_f32
+
 
-def load_image(image_path: str) -> Image.Image:
+def load_image(image_path: str, draft_size=None) -> Image.Image:
     """
     Load an image from disk and return a PIL Image in RGB mode.
 
@@ -28,6 +39,9 @@ def load_image(image_path: str) -> Image.Image:
     ----------
     image_path : str
         Path to an image file (png/jpg/etc).
+    draft_size : tuple[int, int], optional
+        (width, height) the image will be resized to later. JPEGs are
+        then decoded at the smallest DCT scale still >= this size.
 
     Returns
     -------
@@ -48,6 +62,10 @@ def load_image(image_path: str) -> Image.Image:
         # Open image file
         img = Image.open(image_path)
 
+        # Reduced-size JPEG decode (no-op for other formats)
+        if draft_size is not None:
+            img.draft("RGB", draft_size)
+
         # Convert to RGB just to be safe.
         # Even if X-rays are grayscale, BLIP expects 3 channels,
         # and AutoProcessor handles that fine.
@@ -61,3 +79,210 @@ def load_image(image_path: str) -> Image.Image:
         raise InvalidInputError(
             f"Could not open image at path: {image_path}. Error: {e}"
         )
+
+
+class TensorImagePipeline:
+    """
+    Vectorized replacement for the HF image processor (resize + normalize).
+
+    The HF processor resizes and normalizes each PIL image with Python-level
+    numpy code on every call. Here we read its settings ONCE and do the same
+    work with batched torch ops, directly on the inference device:
+
+        uint8 HWC -> float CHW -> resize -> rescale (1/255) -> normalize
+
+    Output matches `processor(images=..., return_tensors="pt")["pixel_values"]`
+    up to resampling rounding.
+
+    CPU fast path (fast_cpu=True, CPU device):
+        PIL uint8 resize -> ONE fused rescale + normalize + HWC->CHW pass
+        (Numba kernel in data/_fast.py), written straight into the batch.
+    """
+
+    # PIL resample codes used by HF image processors -> torch modes
+    _MODES = {0: "nearest", 2: "bilinear", 3: "bicubic"}
+
+    def __init__(
+        self,
+        size,
+        mean,
+        std,
+        rescale_factor: float = 1 / 255,
+        resample: int = 3,
+        do_resize: bool = True,
+        do_rescale: bool = True,
+        do_normalize: bool = True,
+        device=None,
+        dtype=None,
+        fast_cpu: bool = False,
+    ):
+        self.size = (int(size[0]), int(size[1]))
+        self.resample = int(resample)
+        self.mode = self._MODES.get(self.resample, "bicubic")
+        self.rescale_factor = rescale_factor
+        self.do_resize = do_resize
+        self.do_rescale = do_rescale
+        self.do_normalize = do_normalize
+        self.device = torch.device(device or "cpu")
+        self.dtype = dtype or torch.float32
+
+        # Shape (1, 3, 1, 1) so they broadcast over (N, 3, H, W)
+        self.mean = torch.tensor(mean, dtype=torch.float32, device=self.device).view(1, -1, 1, 1)
+        self.std = torch.tensor(std, dtype=torch.float32, device=self.device).view(1, -1, 1, 1)
+
+        # Dedicated CUDA stream for host-to-device copies, so uploads of
+        # the next batch are not queued behind kernels on the main stream
+        self._h2d_stream = torch.cuda.Stream(self.device) if self.device.type == "cuda" else None
+
+        # CPU fast path: out = u8 * scale + shift (per channel)
+        self.fast_cpu = fast_cpu and self.device.type == "cpu"
+        mean_np = np.asarray(mean, dtype=np.float32) if do_normalize else np.zeros(3, np.float32)
+        std_np = np.asarray(std, dtype=np.float32) if do_normalize else np.ones(3, np.float32)
+        factor = np.float32(rescale_factor if do_rescale else 1.0)
+        self._scale = (factor / std_np).astype(np.float32)
+        self._shift = (-mean_np / std_np).astype(np.float32)
+
+        # CPU fast path: one preallocated (N, 3, H, W) batch buffer per
+        # thread, grown on demand and refilled in place by every call
+        self._batch_buffers = threading.local()
+
+    @classmethod
+    def from_processor(
+        cls, image_processor, device=None, dtype=None, fast_cpu: bool = False
+    ) -> "TensorImagePipeline":
+        """Build the pipeline from a HF image processor (e.g. BlipImageProcessor)."""
+        size = image_processor.size
+        return cls(
+            size=(size["height"], size["width"]),
+            mean=image_processor.image_mean,
+            std=image_processor.image_std,
+            rescale_factor=image_processor.rescale_factor,
+            resample=int(image_processor.resample),
+            do_resize=image_processor.do_resize,
+            do_rescale=image_processor.do_rescale,
+            do_normalize=image_processor.do_normalize,
+            device=device,
+            dtype=dtype,
+            fast_cpu=fast_cpu,
+        )
+
+    def to_host(self, images):
+        """
+        CPU stage: RGB PIL images -> list of uint8 (H0, W0, 3) tensors.
+
+        When the pipeline targets CUDA, tensors are page-locked (pinned)
+        so the later host-to-device copy can run asynchronously.
+        Safe to call from a background thread.
+        """
+        if self.fast_cpu:
+            return [self._resize_pil(img) for img in images]
+
+        if self.device.type != "cuda":
+            return [torch.from_numpy(np.array(img, dtype=np.uint8)) for img in images]
+
+        tensors = []
+        for img in images:
+            # Copy the PIL pixels straight into page-locked memory (one copy,
+            # no pageable intermediate). Pinned blocks come from torch's
+            # caching host allocator, so they are recycled across requests.
+            src = np.asarray(img, dtype=np.uint8)
+            t = torch.empty(src.shape, dtype=torch.uint8, pin_memory=True)
+            np.copyto(t.numpy(), src)
+            tensors.append(t)
+        return tensors
+
+    def on_device(self, host_tensors):
+        """
+        Device stage: uint8 host tensors -> (N, 3, H, W) pixel_values.
+        """
+        if self.fast_cpu:
+            return self._normalize_cpu(host_tensors)
+
+        # Move uint8 data first (4x smaller than float32), then do the math
+        arrays = self._upload(host_tensors)
+
+        def _resize(batch):
+            # batch: uint8 (N, H0, W0, 3) -> float (N, 3, H, W)
+            batch = batch.permute(0, 3, 1, 2).float()
+            if not self.do_resize or tuple(batch.shape[-2:]) == self.size:
+                return batch
+            batch = F.interpolate(
+                batch,
+                size=self.size,
+                mode=self.mode,
+                align_corners=False if self.mode != "nearest" else None,
+                antialias=self.mode != "nearest",
+            )
+            # HF resizes in uint8 space: mimic its clipping + rounding
+            return batch.clamp_(0, 255).round_()
+
+        if len({tuple(a.shape) for a in arrays}) == 1:
+            # Same-size images: one stacked resize for the whole batch
+            pixels = _resize(torch.stack(arrays))
+        else:
+            # Mixed sizes: resize one by one straight into ONE contiguous
+            # (N, 3, H, W) buffer (no list of tensors + cat copy)
+            pixels = torch.empty(
+                (len(arrays), 3, *self.size), dtype=torch.float32, device=self.device
+            )
+            for i, a in enumerate(arrays):
+                pixels[i].copy_(_resize(a.unsqueeze(0))[0])
+
+        if self.do_rescale:
+            pixels.mul_(self.rescale_factor)
+
+        if self.do_normalize:
+            pixels.sub_(self.mean).div_(self.std)
+
+        return pixels.to(self.dtype)
+
+    def _upload(self, host_tensors):
+        """H2D copy of pinned tensors on the side stream (async on CUDA)."""
+        if self._h2d_stream is None:
+            return [t.to(self.device) for t in host_tensors]
+
+        with torch.cuda.stream(self._h2d_stream):
+            arrays = [t.to(self.device, non_blocking=True) for t in host_tensors]
+
+        # Main stream waits for the copies only (not for the whole device)
+        current = torch.cuda.current_stream(self.device)
+        current.wait_stream(self._h2d_stream)
+
+        # Tell the allocator these tensors are used on the main stream now
+        for a in arrays:
+            a.record_stream(current)
+        return arrays
+
+    def _resize_pil(self, img: Image.Image) -> np.ndarray:
+        """CPU fast path: resize in uint8 with PIL (like HF does)."""
+        height, width = self.size
+        if self.do_resize and img.size != (width, height):
+            img = img.resize((width, height), resample=self.resample)
+        return np.asarray(img, dtype=np.uint8)
+
+    def _batch_buffer(self, n: int, height: int, width: int) -> np.ndarray:
+        """This thread's reusable float32 batch buffer, as an (n, 3, H, W) view."""
+        buf = getattr(self._batch_buffers, "buf", None)
+        if buf is None or buf.shape[0] < n or buf.shape[2:] != (height, width):
+            buf = np.empty((n, 3, height, width), dtype=np.float32)
+            self._batch_buffers.buf = buf
+        return buf[:n]
+
+    def _normalize_cpu(self, arrays) -> torch.Tensor:
+        """
+        CPU fast path: fused kernel writes each image into the batch.
+
+        The batch lives in a per-thread buffer that the NEXT call on the
+        same thread overwrites: consume (or copy) the result before that.
+        """
+        height, width = arrays[0].shape[:2]
+        out = self._batch_buffer(len(arrays), height, width)
+        for i, arr in enumerate(arrays):
+            normalize_u8_to_f32(arr, self._scale, self._shift, out[i])
+        return torch.from_numpy(out).to(self.dtype)
+
+    def __call__(self, images):
+        """
+        Convert RGB PIL images into a (N, 3, H, W) pixel_values tensor.
+        """
+        return self.on_device(self.to_host(images))
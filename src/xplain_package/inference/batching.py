@@ -0,0 +1,172 @@
+"""
+batching.py
+
+Dynamic server-side batching for single-image requests.
+
+Why:
+- predict_caption() runs ONE image per generate call.
+- Under concurrent load, N requests = N forward passes.
+- BLIP happily processes several images in one forward pass.
+
+How:
+- Each request pushes (image, digest, Future) into an asyncio.Queue.
+- One background worker drains up to MAX_BATCH items, waiting at most
+  MAX_WAIT_MS after the first one, then runs predict_uncached() once.
+- Each Future receives its own caption (same order as the batch).
+- Images already in the caption cache never enter the queue; images
+  already in the pixel cache enter it undecoded (no preprocess_image).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, BinaryIO, List, Optional, Tuple, Union
+
+from PIL import Image
+
+from xplain_package.config import settings
+from xplain_package.inference.predict import (
+    caption_cache,
+    caption_cache_key,
+    decode_image,
+    pixel_cache,
+    predict_uncached,
+    read_and_hash,
+)
+from xplain_package.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-image requests into batches.
+
+    Usage (inside an asyncio app):
+        batcher = MicroBatcher()
+        await batcher.start()
+        caption = await batcher.submit(image_bytes)
+        await batcher.stop()
+    """
+
+    def __init__(
+        self,
+        max_batch: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ) -> None:
+        self.max_batch = max(1, max_batch or settings.MAX_BATCH)
+        self.max_wait = (
+            max_wait_ms if max_wait_ms is not None else settings.MAX_WAIT_MS
+        ) / 1000.0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Create the queue and start the background worker."""
+        if self._worker is not None:
+            return
+
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Micro-batcher started (max_batch={self.max_batch}, "
+            f"max_wait_ms={self.max_wait * 1000:g})"
+        )
+
+    async def stop(self) -> None:
+        """Cancel the background worker."""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def submit(self, image: Union[Image.Image, bytes, memoryview, str, BinaryIO]) -> str:
+        """
+        Queue ONE image and wait for its caption.
+
+        Decoding happens here (in a thread), so a broken upload fails
+        only its own request and never the whole batch.
+        """
+        if self._queue is None:
+            raise RuntimeError("MicroBatcher.start() must be called first.")
+
+        key, cached, image, digest = await asyncio.to_thread(self._prepare, image)
+        if cached is not None:
+            return cached
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, digest, key, future))
+        return await future
+
+    @staticmethod
+    def _prepare(image) -> Tuple[Optional[tuple], Optional[str], Any, Optional[bytes]]:
+        """
+        Hash + caption cache lookup, then decode only if needed.
+
+        Images whose pixels are cached stay undecoded: the batch reuses
+        the cached pixel_values by digest. Freshly decoded images are
+        stored in the pixel cache under the same digest by the batch.
+        """
+        image, digest = read_and_hash(image)
+        key = caption_cache_key(digest)
+        if key is not None:
+            cached = caption_cache.get(key)
+            if cached is not None:
+                return key, cached, None, digest
+
+        if digest is None or pixel_cache.get(digest) is None:
+            image = decode_image(image)
+        return key, None, image, digest
+
+    async def _collect(self) -> List[Tuple[Any, Optional[bytes], Optional[tuple], asyncio.Future]]:
+        """Wait for one item, then gather more until full or timed out."""
+        loop = asyncio.get_running_loop()
+
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        """Background loop: collect a batch, run it, resolve futures."""
+        while True:
+            batch = await self._collect()
+
+            # Skip requests whose client already went away
+            batch = [item for item in batch if not item[3].done()]
+            if not batch:
+                continue
+
+            try:
+                captions = await asyncio.to_thread(
+                    predict_uncached,
+                    [img for img, _, _, _ in batch],
+                    [digest for _, digest, _, _ in batch],
+                )
+            except Exception as e:
+                logger.exception(f"Batched inference failed: {e}")
+                for _, _, _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            for (_, _, key, fut), caption in zip(batch, captions):
+                if key is not None:
+                    caption_cache.put(key, caption)
+                if not fut.done():
+                    fut.set_result(caption)
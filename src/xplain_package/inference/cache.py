@@ -0,0 +1,79 @@
+"""
+cache.py
+
+Small thread-safe LRU cache + content hashing helpers.
+
+Used to skip re-inference when the SAME image bytes come back
+(retries, dashboards re-opening the same X-ray, ...).
+
+Why not functools.lru_cache?
+- lru_cache needs the full input as the key; we key on a short
+  content hash and compute the value lazily on a miss.
+- We also need explicit get()/put() from several places
+  (predict_* and the micro-batcher).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, BinaryIO, Hashable, Optional, Union
+
+# Read size when hashing file objects (constant memory)
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_digest(data: Union[bytes, memoryview, BinaryIO]) -> bytes:
+    """
+    Fast 128-bit content hash of raw image bytes.
+
+    blake2b is in the stdlib and faster than sha256 on 64-bit CPUs.
+    File objects are hashed chunk by chunk and rewound afterwards,
+    so they can still be decoded.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    h = hashlib.blake2b(digest_size=16)
+    while chunk := data.read(HASH_CHUNK_SIZE):
+        h.update(chunk)
+    data.seek(0)
+    return h.digest()
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used mapping, safe to share between threads.
+
+    maxsize <= 0 disables caching (get always misses, put is a no-op).
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,319 @@
+"""
+cuda_graphs.py
+
+CUDA graph capture for the BLIP vision encoder.
+
+Why:
+- The dominant API pattern is ONE image per request (batch=1).
+- At batch=1 the GPU is mostly idle; time goes into launching
+  hundreds of small kernels from Python.
+- A CUDA graph records those launches once and replays them
+  with a single call.
+
+How:
+- We capture the vision encoder forward for a fixed input shape
+  (e.g. (1, 3, 384, 384)) into a static input/output buffer.
+- At inference time we copy() real pixels into the static input,
+  replay() the graph, and return a copy of the static output.
+- Any other shape (batches, different sizes) runs the normal eager path.
+
+Only used on CUDA with greedy decoding (num_beams == 1, no sampling).
+
+Decoder (optional, DECODE_CUDA_GRAPH=true):
+- The text decoder runs once per generated token, so at batch=1 the
+  decode loop is even more launch-bound than the encoder.
+- Its KV cache grows every step (new shapes), which graphs cannot replay.
+  Instead we capture ONE no-cache forward over a fixed-length token buffer
+  (1, max_new_tokens + 1). Causal masking means the logits at step t only
+  see tokens <= t, so unused buffer slots never change the result.
+- Each greedy step = one graph replay + an on-device argmax.
+- Trade-off: without a KV cache every step re-runs the whole buffer
+  (O(L^2) decoder work). It only pays off when launch overhead
+  dominates, so load_captioner() times it against generate() and
+  checks the captions match before using it.
+- Plain argmax only: if the model's generation_config asks for logits
+  processors (repetition_penalty, min_length, no_repeat_ngram_size,
+  forced BOS/EOS, ...), the graphed decoder is NOT enabled.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Tuple
+
+import torch
+from transformers.modeling_outputs import BaseModelOutputWithPooling
+
+from xplain_package.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class GraphedVisionEncoder(torch.nn.Module):
+    """
+    Drop-in replacement for `model.vision_model` that replays CUDA graphs.
+
+    Graphs are stored per (shape, dtype) in a dict, so several fixed
+    shapes can coexist. Inputs without a captured graph fall back to
+    the wrapped eager module.
+    """
+
+    def __init__(self, vision_model: torch.nn.Module, warmup_iters: int = 3) -> None:
+        super().__init__()
+        self.vision_model = vision_model
+        self.warmup_iters = warmup_iters
+
+        # (shape, dtype) -> (graph, static_input, static_output)
+        self._graphs: Dict[Tuple, Tuple[torch.cuda.CUDAGraph, torch.Tensor, Tuple]] = {}
+
+        # Static buffers are shared: one replay at a time
+        self._lock = threading.Lock()
+
+    @property
+    def config(self):
+        return self.vision_model.config
+
+    @torch.no_grad()
+    def capture(self, shape: Tuple[int, ...], dtype: torch.dtype, device: torch.device) -> None:
+        """Record the encoder forward for ONE static input shape."""
+        key = (tuple(shape), dtype)
+        if key in self._graphs:
+            return
+
+        static_input = torch.zeros(shape, dtype=dtype, device=device)
+
+        # Warm up on a side stream (required before capture:
+        # lets cuDNN / cuBLAS pick algorithms and allocate workspaces)
+        side = torch.cuda.Stream()
+        side.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(side):
+            for _ in range(self.warmup_iters):
+                self.vision_model(pixel_values=static_input, return_dict=False)
+        torch.cuda.current_stream().wait_stream(side)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            static_output = self.vision_model(pixel_values=static_input, return_dict=False)
+
+        self._graphs[key] = (graph, static_input, static_output)
+        logger.info(f"Captured CUDA graph for vision encoder, input shape={tuple(shape)}")
+
+    def forward(self, pixel_values: torch.Tensor = None, **kwargs):
+        # Graphs only cover the plain forward (no attentions / hidden states)
+        wants_extras = (
+            kwargs.get("output_attentions")
+            or kwargs.get("output_hidden_states")
+            or kwargs.get("interpolate_pos_encoding")
+        )
+        entry = None
+        if pixel_values is not None and not wants_extras:
+            entry = self._graphs.get((tuple(pixel_values.shape), pixel_values.dtype))
+
+        if entry is None:
+            return self.vision_model(pixel_values=pixel_values, **kwargs)
+
+        graph, static_input, static_output = entry
+
+        with self._lock:
+            static_input.copy_(pixel_values)
+            graph.replay()
+            # Clone: the next replay overwrites the static buffers
+            last_hidden_state, pooler_output = (t.clone() for t in static_output[:2])
+
+        if kwargs.get("return_dict", True) is False:
+            return (last_hidden_state, pooler_output)
+
+        return BaseModelOutputWithPooling(
+            last_hidden_state=last_hidden_state,
+            pooler_output=pooler_output,
+        )
+
+
+class GraphedGreedyDecoder:
+    """
+    Greedy batch=1 caption generation with the text decoder as a CUDA graph.
+
+    Plain argmax decoding from BOS until SEP (BLIP's end token) or
+    max_new_tokens, like model.generate(num_beams=1, do_sample=False)
+    without extra logits processors.
+    """
+
+    # Steps between EOS checks (each check is a device -> host sync)
+    EOS_CHECK_EVERY = 8
+
+    def __init__(self, model: torch.nn.Module, max_new_tokens: int, warmup_iters: int = 3) -> None:
+        text_config = model.config.text_config
+        self.model = model
+        self.length = max_new_tokens + 1
+        self.bos_token_id = text_config.bos_token_id
+        self.eos_token_id = text_config.sep_token_id
+        self.pad_token_id = text_config.pad_token_id or 0
+        self.warmup_iters = warmup_iters
+
+        self._graph = None
+        self._lock = threading.Lock()
+
+    def _step(self) -> torch.Tensor:
+        """Full-buffer decoder forward -> logits (1, length, vocab)."""
+        return self.model.text_decoder(
+            input_ids=self._ids,
+            attention_mask=self._mask,
+            encoder_hidden_states=self._image_embeds,
+            encoder_attention_mask=self._image_mask,
+            use_cache=False,
+            return_dict=False,
+        )[0]
+
+    @torch.no_grad()
+    def capture(self, image_tokens: int, hidden_size: int, dtype: torch.dtype, device: torch.device) -> None:
+        """Record the decoder forward for batch=1 and a fixed image size."""
+        self._ids = torch.full((1, self.length), self.pad_token_id, dtype=torch.long, device=device)
+        self._mask = torch.ones((1, self.length), dtype=torch.long, device=device)
+        self._image_embeds = torch.zeros((1, image_tokens, hidden_size), dtype=dtype, device=device)
+        self._image_mask = torch.ones((1, image_tokens), dtype=torch.long, device=device)
+
+        # Same warmup-on-side-stream rule as the encoder capture
+        side = torch.cuda.Stream()
+        side.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(side):
+            for _ in range(self.warmup_iters):
+                self._step()
+        torch.cuda.current_stream().wait_stream(side)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            self._logits = self._step()
+
+        self._graph = graph
+        logger.info(f"Captured CUDA graph for text decoder, length={self.length}")
+
+    def generate(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        """Token ids (1, n) for ONE image, starting with BOS (like generate())."""
+        image_embeds = self.model.vision_model(pixel_values=pixel_values, return_dict=False)[0]
+
+        with self._lock:
+            self._image_embeds.copy_(image_embeds)
+            self._ids.fill_(self.pad_token_id)
+            self._ids[0, 0] = self.bos_token_id
+
+            steps = self.length - 1
+            for t in range(steps):
+                self._graph.replay()
+                # On-device argmax straight into the next slot (no sync)
+                self._ids[0, t + 1] = self._logits[0, t].argmax()
+
+                done = t + 1 == steps
+                if not done and (t + 1) % self.EOS_CHECK_EVERY == 0:
+                    done = bool((self._ids[0, 1:t + 2] == self.eos_token_id).any())
+                if done:
+                    break
+
+            ids = self._ids[:, :t + 2].clone()
+
+        # Cut right after the first EOS (checks are only every few steps)
+        hits = (ids[0, 1:] == self.eos_token_id).nonzero()
+        if hits.numel():
+            ids = ids[:, :int(hits[0]) + 2]
+        return ids
+
+
+# generation_config fields that add logits processors, with their
+# "no-op" value. Anything else means generate() does more than argmax.
+_NEUTRAL_GENERATION_OPTIONS = {
+    "repetition_penalty": 1.0,
+    "encoder_repetition_penalty": 1.0,
+    "no_repeat_ngram_size": 0,
+    "encoder_no_repeat_ngram_size": 0,
+    "min_length": 0,
+    "min_new_tokens": None,
+    "forced_bos_token_id": None,
+    "forced_eos_token_id": None,
+    "bad_words_ids": None,
+    "suppress_tokens": None,
+    "begin_suppress_tokens": None,
+    "sequence_bias": None,
+    "exponential_decay_length_penalty": None,
+}
+
+
+def unsupported_generation_options(model: torch.nn.Module) -> List[str]:
+    """generation_config options the graphed greedy loop cannot apply."""
+    generation_config = getattr(model, "generation_config", None)
+    if generation_config is None:
+        return []
+
+    unsupported = []
+    for name, neutral in _NEUTRAL_GENERATION_OPTIONS.items():
+        value = getattr(generation_config, name, neutral)
+        if value is None or value == neutral:
+            continue
+        if isinstance(value, (list, tuple, dict)) and not value:
+            continue
+        unsupported.append(f"{name}={value}")
+    return unsupported
+
+
+def enable_decoder_cuda_graph(
+    model: torch.nn.Module,
+    image_size: Tuple[int, int],
+    max_new_tokens: int,
+    dtype: torch.dtype,
+    device: torch.device,
+):
+    """
+    Build and capture a GraphedGreedyDecoder.
+
+    Returns the decoder, or None if the model's generation_config needs
+    logits processors or capture failed (eager generate is used then).
+    """
+    if device.type != "cuda":
+        return None
+
+    unsupported = unsupported_generation_options(model)
+    if unsupported:
+        logger.warning(
+            f"Decoder CUDA graph disabled, generation_config needs logits processors: "
+            f"{', '.join(unsupported)}"
+        )
+        return None
+
+    vision_config = model.config.vision_config
+    height, width = image_size
+    image_tokens = (height // vision_config.patch_size) * (width // vision_config.patch_size) + 1
+
+    decoder = GraphedGreedyDecoder(model, max_new_tokens)
+    try:
+        decoder.capture(image_tokens, vision_config.hidden_size, dtype=dtype, device=device)
+    except Exception as e:
+        logger.warning(f"Decoder CUDA graph capture failed, using generate(): {e}")
+        return None
+
+    return decoder
+
+
+def enable_vision_cuda_graph(
+    model: torch.nn.Module,
+    image_size: Tuple[int, int],
+    dtype: torch.dtype,
+    device: torch.device,
+) -> bool:
+    """
+    Wrap `model.vision_model` and capture the batch=1 graph.
+
+    Returns True if the graph is active, False if capture failed
+    (the model is left untouched in that case).
+    """
+    if device.type != "cuda":
+        return False
+
+    graphed = GraphedVisionEncoder(model.vision_model)
+    height, width = image_size
+
+    try:
+        graphed.capture((1, 3, height, width), dtype=dtype, device=device)
+    except Exception as e:
+        logger.warning(f"CUDA graph capture failed, using eager encoder: {e}")
+        return False
+
+    model.vision_model = graphed
+    return True
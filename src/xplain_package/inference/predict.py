@@ -17,15 +17,29 @@ Design goals:
 
 from __future__ import annotations
 
+import contextlib
+import functools
+import os
+import re
 import threading
-from typing import List, Optional, Union
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Union
 
 import torch
 from PIL import Image
 
 from xplain_package.config import settings          # global config (env-driven)
-from xplain_package.models.registry import get_model
+from xplain_package.inference.cache import LRUCache, content_digest
+from xplain_package.inference.cuda_graphs import (
+    enable_decoder_cuda_graph,
+    enable_vision_cuda_graph,
+)
+from xplain_package.inference.trt_backend import enable_tensorrt_vision
+from xplain_package.models.registry import clear_model_cache, get_device, get_model
 from xplain_package.preprocessing import preprocess_image
+from xplain_package.utils.exceptions import ModelLoadError
 from xplain_package.utils.logging import get_logger
 
 # ------------------------------------------------------------
@@ -41,11 +55,306 @@ logger = get_logger(__name__)
 # ------------------------------------------------------------
 _MODEL = None
 _PROCESSOR = None
+_PIPELINE = None   # tensor resize + normalize (replaces processor images=...)
 _DEVICE = None
+_DTYPE = torch.float32
+
+# model.generate / batch_decode with every argument pre-bound at load time
+_GEN_FAST = None
+_DECODE = None
 
 # A lock to avoid double-loading in parallel startup situations
 _LOAD_LOCK = threading.Lock()
 
+# In-process GCS download (settings.MODEL_DOWNLOAD_IN_APP)
+_DOWNLOAD_THREAD = None
+_DOWNLOAD_RESULT: List[int] = []
+_DOWNLOAD_LOCK = threading.Lock()
+
+
+def _generation_kwargs() -> dict:
+    """
+    Translate settings.GENERATION_MODE into model.generate() arguments.
+
+    Speed vs quality: greedy decoding runs ONE decoder sequence per image;
+    beam search runs BEAM_SIZE of them. For short radiology captions greedy
+    is usually indistinguishable and ~3x faster than 3 beams.
+    """
+    mode = settings.GENERATION_MODE
+
+    if mode == "greedy":
+        return {"num_beams": 1, "do_sample": False}
+
+    if mode == "beam":
+        return {"num_beams": max(2, settings.BEAM_SIZE), "do_sample": False}
+
+    if mode == "sample":
+        return {"num_beams": 1, "do_sample": True, "top_p": settings.TOP_P}
+
+    raise ValueError(
+        f"Unknown GENERATION_MODE='{mode}'. Expected: greedy | beam | sample."
+    )
+
+
+# Resolved once: settings are frozen for the life of the process,
+# so the hot path reads plain module constants (no settings lookups)
+_GEN_KWARGS = _generation_kwargs()
+_MAX_NEW_TOKENS = settings.MAX_NEW_TOKENS
+_CHUNK_SIZE = max(1, settings.MAX_BATCH)
+
+# Everything generate() needs, merged once
+_GENERATE_KWARGS = {"max_new_tokens": _MAX_NEW_TOKENS, **_GEN_KWARGS}
+
+# Sampled captions are random on purpose: never cache them
+_CACHE_CAPTIONS = not _GEN_KWARGS["do_sample"]
+
+# Captions for already-seen images, keyed by content hash
+# (+ generation settings, so a config change never serves stale text)
+caption_cache = LRUCache(settings.CAPTION_CACHE_SIZE)
+
+# Preprocessed pixel_values (CPU tensors) keyed by content hash, so a
+# re-upload skips decode + resize + normalize even when the caption
+# itself is not cached (e.g. sampling). Kept small: ~1.7 MB per entry.
+pixel_cache = LRUCache(settings.PIXEL_CACHE_SIZE)
+
+# Background threads that decode the NEXT chunk of a batch request
+# while the current chunk runs on the GPU (PIL decode releases the GIL)
+_PREFETCH_POOL = ThreadPoolExecutor(
+    max_workers=max(1, (os.cpu_count() or 2) // 2),
+    thread_name_prefix="xplain-prefetch",
+)
+
+# Per-image CPU work INSIDE a chunk (file read, hash, JPEG/PNG decode).
+# Separate from the prefetch pool: prefetch tasks submit into this one,
+# and sharing one bounded pool could deadlock.
+_DECODE_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 2,
+    thread_name_prefix="xplain-decode",
+)
+
+
+def _autocast(device: Optional[torch.device] = None, dtype: Optional[torch.dtype] = None):
+    """Autocast context for generate (no-op on CPU / fp32)."""
+    device = device or _DEVICE
+    dtype = dtype or _DTYPE
+    if device is None or device.type != "cuda" or dtype == torch.float32:
+        return contextlib.nullcontext()
+    return torch.autocast(device_type="cuda", dtype=dtype)
+
+
+def _processor_image_size(processor) -> tuple:
+    """(height, width) the processor resizes every image to."""
+    size = processor.image_processor.size
+    return size["height"], size["width"]
+
+
+def is_loaded() -> bool:
+    """True once load_captioner() has fully finished (used by /ready)."""
+    return _MODEL is not None
+
+
+def _use_shared_inductor_cache(cache_root: str) -> None:
+    """
+    Point TorchInductor at a shared cache dir keyed by GPU + torch version.
+
+    Compiled kernels are only valid for the GPU and torch build that
+    produced them, so both are part of the path. Must run before the
+    first torch.compile.
+    """
+    gpu = re.sub(r"[^A-Za-z0-9]+", "_", torch.cuda.get_device_name()).strip("_")
+    cache_dir = os.path.join(cache_root, "inductor", gpu, torch.__version__)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    os.environ["TORCHINDUCTOR_CACHE_DIR"] = cache_dir
+    # Persist whole compiled graphs too (not only Triton kernels)
+    os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+    logger.info(f"TorchInductor cache: {cache_dir}")
+
+
+def _compile_vision_encoder(model, image_size: tuple, dtype: torch.dtype, device: torch.device) -> bool:
+    """
+    torch.compile the vision encoder and compile it NOW (not on first request).
+
+    Returns True if the compiled encoder is active, False if compilation
+    failed (the eager encoder is kept in that case).
+    """
+    eager = model.vision_model
+    model.vision_model = torch.compile(eager, mode="reduce-overhead", fullgraph=False)
+
+    height, width = image_size
+    dummy = torch.zeros((1, 3, height, width), dtype=dtype, device=device)
+
+    try:
+        # Dummy forward at the processor's native shape triggers the compile
+        with torch.inference_mode():
+            model.vision_model(pixel_values=dummy)
+        torch.cuda.synchronize(device)
+    except Exception as e:
+        logger.warning(f"torch.compile failed, using eager encoder: {e}")
+        model.vision_model = eager
+        return False
+
+    logger.info("Vision encoder compiled with torch.compile.")
+    return True
+
+
+def _download_model() -> None:
+    """
+    Run the GCS download (io/gcs.py main) and keep its exit code.
+
+    A file lock next to LOCAL_MODEL_DIR makes several workers on one
+    machine download ONCE: the others wait, then find the folder up to
+    date (manifest check) and skip.
+    """
+    import fcntl
+
+    from xplain_package.io import gcs
+
+    lock_path = os.path.abspath(settings.LOCAL_MODEL_DIR).rstrip(os.sep) + ".lock"
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            _DOWNLOAD_RESULT.append(gcs.main())
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def start_model_download() -> None:
+    """Start the background GCS download once (no-op unless enabled)."""
+    global _DOWNLOAD_THREAD
+
+    if not (settings.MODEL_DOWNLOAD_IN_APP and settings.GCS_MODEL_URI):
+        return
+
+    with _DOWNLOAD_LOCK:
+        if _DOWNLOAD_THREAD is None:
+            _DOWNLOAD_THREAD = threading.Thread(
+                target=_download_model, name="xplain-gcs-download", daemon=True
+            )
+            _DOWNLOAD_THREAD.start()
+
+
+def _wait_for_download() -> None:
+    """
+    Block until the background download is done; raise if it failed.
+
+    A failed download is forgotten, so the next load_captioner() call
+    starts a fresh one instead of re-raising the stale failure.
+    """
+    global _DOWNLOAD_THREAD
+
+    thread = _DOWNLOAD_THREAD
+    if thread is None:
+        return
+
+    thread.join()
+    if _DOWNLOAD_RESULT != [0]:
+        with _DOWNLOAD_LOCK:
+            if _DOWNLOAD_THREAD is thread:
+                _DOWNLOAD_THREAD = None
+                _DOWNLOAD_RESULT.clear()
+        raise ModelLoadError(
+            f"GCS model download failed ({settings.GCS_MODEL_URI}). See logs above."
+        )
+
+
+def _with_graphed_decoder(decoder, gen_fast):
+    """generate(): graphed greedy loop for batch=1, regular generate otherwise."""
+    def generate(pixel_values: torch.Tensor) -> torch.Tensor:
+        if pixel_values.shape[0] == 1:
+            return decoder.generate(pixel_values)
+        return gen_fast(pixel_values=pixel_values)
+    return generate
+
+
+@torch.inference_mode()
+def _graphed_decoder_pays_off(decoder, gen_fast, pipeline, image_size: tuple, device, dtype) -> bool:
+    """
+    Load-time check of the graphed greedy decoder against generate().
+
+    On two probe images (black + gradient) the token ids must match
+    generate() exactly, and the graphed loop must be faster (it re-runs
+    the full buffer each step, no KV cache). Never fatal: any problem
+    means "use generate()".
+    """
+    height, width = image_size
+    probes = [
+        Image.new("RGB", (width, height)),
+        Image.linear_gradient("L").resize((width, height)).convert("RGB"),
+    ]
+
+    def _timed(fn, pixel_values):
+        torch.cuda.synchronize(device)
+        start = time.perf_counter()
+        with _autocast(device, dtype):
+            ids = fn(pixel_values)
+        torch.cuda.synchronize(device)
+        return ids, time.perf_counter() - start
+
+    def _tokens(ids):
+        """Ids up to and including the first EOS (generate may pad after it)."""
+        tokens = ids[0].tolist()
+        if decoder.eos_token_id in tokens[1:]:
+            tokens = tokens[: tokens.index(decoder.eos_token_id, 1) + 1]
+        return tokens
+
+    try:
+        graphed_time = eager_time = 0.0
+        for image in probes:
+            pixel_values = pipeline([image])
+
+            # First calls warm both paths up (not timed)
+            _timed(decoder.generate, pixel_values)
+            _timed(lambda px: gen_fast(pixel_values=px), pixel_values)
+
+            graphed_ids, graphed_dt = _timed(decoder.generate, pixel_values)
+            eager_ids, eager_dt = _timed(lambda px: gen_fast(pixel_values=px), pixel_values)
+
+            if _tokens(graphed_ids) != _tokens(eager_ids):
+                logger.warning("Decoder CUDA graph disabled: output differs from generate().")
+                return False
+
+            graphed_time += graphed_dt
+            eager_time += eager_dt
+    except Exception as e:
+        logger.warning(f"Decoder CUDA graph check failed, using generate(): {e}")
+        return False
+
+    if graphed_time >= eager_time:
+        logger.warning(
+            f"Decoder CUDA graph disabled: not faster than generate() "
+            f"({graphed_time * 1000:.1f} ms vs {eager_time * 1000:.1f} ms)."
+        )
+        return False
+
+    logger.info(
+        f"Decoder CUDA graph enabled ({graphed_time * 1000:.1f} ms vs "
+        f"{eager_time * 1000:.1f} ms for generate())."
+    )
+    return True
+
+
+@torch.inference_mode()
+def _warmup(gen_fast, pipeline, image_size: tuple, device: torch.device, dtype: torch.dtype) -> None:
+    """
+    Caption ONE black image through the real inference path.
+
+    Pays the one-time costs (CUDA context, cuDNN autotune, lazy kernel
+    loading, allocator growth) before the first request. Never fatal.
+    """
+    height, width = image_size
+    try:
+        pixel_values = pipeline([Image.new("RGB", (width, height))])
+        with _autocast(device, dtype):
+            gen_fast(pixel_values=pixel_values)
+        if device.type == "cuda":
+            torch.cuda.synchronize(device)
+        logger.info("Warmup caption done.")
+    except Exception as e:
+        logger.warning(f"Warmup failed (first request will be slower): {e}")
+
 
 def load_captioner() -> None:
     """
@@ -62,39 +371,303 @@ def load_captioner() -> None:
 
     NO HuggingFace fallback here.
     """
-    global _MODEL, _PROCESSOR, _DEVICE
+    global _MODEL, _PROCESSOR, _PIPELINE, _DEVICE, _DTYPE, _GEN_FAST, _DECODE
 
-    if _MODEL is not None and _PROCESSOR is not None:
+    if _MODEL is not None:
         # Already loaded: nothing to do
         return
 
     with _LOAD_LOCK:
         # Double-check inside lock
-        if _MODEL is not None and _PROCESSOR is not None:
+        if _MODEL is not None:
             return
 
         logger.info("Loading captioner (offline-only)…")
 
-        # Device choice: GPU if available, else CPU
-        _DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        logger.info(f"Using device: {_DEVICE}")
+        # Fail on a bad setting before paying for a full model load
+        if settings.BACKEND not in ("pytorch", "tensorrt"):
+            raise ValueError(
+                f"Unknown BACKEND='{settings.BACKEND}'. Expected: pytorch | tensorrt."
+            )
+
+        # Everything is built in locals and only published at the end:
+        # a failed load leaves the module unloaded (not half-loaded), and
+        # concurrent readers never see a model without its pipeline.
+
+        # Start the model download first (MODEL_DOWNLOAD_IN_APP):
+        # device / CUDA setup below overlaps with it
+        start_model_download()
+
+        # Device choice: settings.DEVICE, or GPU if available, else CPU
+        device = get_device(settings)
+        logger.info(f"Using device: {device}")
+
+        # Create the CUDA context now (not inside from_pretrained)
+        if device.type == "cuda":
+            torch.cuda.init()
+
+        # Several CPU workers on one machine: split the cores between them
+        # instead of letting every worker spawn one thread per core
+        if device.type == "cpu" and settings.WORKERS > 1:
+            torch.set_num_threads(max(1, (os.cpu_count() or 1) // settings.WORKERS))
+            logger.info(f"Torch threads per worker: {torch.get_num_threads()}")
+
+        # Model files must be on disk before from_pretrained
+        _wait_for_download()
 
         # Get model wrapper from registry (future-proof)
         captioner = get_model(settings)
 
-        # Extract actual HF objects
-        _MODEL = captioner.model.to(_DEVICE)
-        _PROCESSOR = captioner.processor
-
-        # Put model in eval mode for inference
-        _MODEL.eval()
+        # The registry caches this captioner, and the steps below wrap
+        # or swap its modules in place (TensorRT, torch.compile, CUDA
+        # graphs). On failure, evict it so a retry starts from freshly
+        # loaded weights instead of wrapping a half-converted model again.
+        try:
+            # Extract actual HF objects
+            model = captioner.model
+            processor = captioner.processor
+
+            # Allow TF32 tensor-core matmuls for any remaining fp32 ops
+            torch.set_float32_matmul_precision("high")
+            torch.backends.cudnn.allow_tf32 = True
+
+            # Every image has the same size after preprocessing, so cuDNN can
+            # benchmark the patch-embedding conv once and reuse the fastest algo
+            torch.backends.cudnn.benchmark = True
+
+            # Weights were loaded straight onto the device in their final dtype
+            # (device_map + torch_dtype, or bitsandbytes): no .to() needed
+            device = captioner.device
+            dtype = model.dtype
+
+            logger.info(f"Inference dtype: {dtype}")
+
+            # Batched resize/normalize on the inference device, built ONCE by
+            # the captioner from the processor settings (Numba kernel on CPU)
+            pipeline = captioner.pipeline
+
+            # Put model in eval mode for inference
+            model.eval()
+
+            image_size = _processor_image_size(processor)
+
+            if settings.BACKEND == "tensorrt":
+                # Swap the vision encoder for a cached fp16 TensorRT engine
+                enable_tensorrt_vision(
+                    model,
+                    engine_dir=settings.ENGINE_CACHE_DIR,
+                    image_size=image_size,
+                    max_batch=settings.MAX_BATCH,
+                    model_dir=model.name_or_path,
+                )
+
+            # Fused Inductor kernels for the encoder ("reduce-overhead" also
+            # uses CUDA graphs internally, so it replaces CUDA_GRAPHS below)
+            elif settings.TORCH_COMPILE and device.type == "cuda":
+                if settings.INDUCTOR_CACHE_DIR:
+                    _use_shared_inductor_cache(settings.INDUCTOR_CACHE_DIR)
+                _compile_vision_encoder(
+                    model,
+                    image_size=image_size,
+                    dtype=dtype,
+                    device=device,
+                )
+
+            # Batch=1 greedy decoding: replay the encoder as a CUDA graph
+            elif (
+                settings.CUDA_GRAPHS
+                and _GEN_KWARGS["num_beams"] == 1
+                and not _GEN_KWARGS["do_sample"]
+                and device.type == "cuda"
+            ):
+                enable_vision_cuda_graph(
+                    model,
+                    image_size=image_size,
+                    dtype=dtype,
+                    device=device,
+                )
+
+            # Specialize the hot calls once: per request only pixel_values
+            # / generated ids are passed (no kwargs merging, no lookups)
+            gen_fast = functools.partial(model.generate, **_GENERATE_KWARGS)
+            decode = functools.partial(processor.tokenizer.batch_decode, skip_special_tokens=True)
+
+            # Batch=1 greedy decoding: replay the decode loop as a CUDA graph
+            if (
+                settings.DECODE_CUDA_GRAPH
+                and _GEN_KWARGS["num_beams"] == 1
+                and not _GEN_KWARGS["do_sample"]
+                and device.type == "cuda"
+            ):
+                decoder = enable_decoder_cuda_graph(
+                    model,
+                    image_size=image_size,
+                    max_new_tokens=_MAX_NEW_TOKENS,
+                    dtype=dtype,
+                    device=device,
+                )
+                if decoder is not None and _graphed_decoder_pays_off(
+                    decoder, gen_fast, pipeline, image_size, device, dtype
+                ):
+                    gen_fast = _with_graphed_decoder(decoder, gen_fast)
+
+            # Before publishing: /ready only turns green once this is done
+            if settings.WARMUP:
+                _warmup(gen_fast, pipeline, image_size, device, dtype)
+        except Exception:
+            clear_model_cache()
+            raise
+
+        # Publish: _MODEL last, it is the "loaded" flag checked above
+        _PROCESSOR, _PIPELINE, _DEVICE, _DTYPE = processor, pipeline, device, dtype
+        _GEN_FAST, _DECODE = gen_fast, decode
+        _MODEL = model
 
         logger.info("Model loaded and cached successfully.")
 
 
-@torch.no_grad()
+def _as_bytes(
+    image: Union[Image.Image, bytes, memoryview, str, BinaryIO],
+) -> Union[Image.Image, bytes, memoryview, BinaryIO]:
+    """Read path inputs into memory so they can be hashed (others stay as-is)."""
+    if isinstance(image, (str, Path)):
+        with open(image, "rb") as f:
+            return f.read()
+    return image
+
+
+def _digest(image: Union[Image.Image, bytes, memoryview, BinaryIO]) -> Optional[bytes]:
+    """Content hash of raw bytes / binary file objects (None for PIL images)."""
+    if not isinstance(image, (bytes, bytearray, memoryview)) and not hasattr(image, "read"):
+        return None
+    return content_digest(image)
+
+
+def decode_image(image: Union[Image.Image, bytes, memoryview, str, BinaryIO]) -> Image.Image:
+    """
+    preprocess_image with JPEG draft decoding at the model input size.
+
+    Only once the model is loaded (the pipeline knows the size), and only
+    if the processor resizes anyway (otherwise the draft would change
+    the output).
+    """
+    if _PIPELINE is None or not _PIPELINE.do_resize:
+        return preprocess_image(image)
+    height, width = _PIPELINE.size
+    return preprocess_image(image, draft_size=(width, height))
+
+
+def read_and_hash(image: Union[Image.Image, bytes, memoryview, str, BinaryIO]) -> tuple:
+    """
+    (image, content digest): paths are read into memory first, the digest
+    is None for PIL images. One task per image on the decode pool.
+    """
+    image = _as_bytes(image)
+    return image, _digest(image)
+
+
+def _map_images(fn, images: list) -> list:
+    """fn over images, in parallel when there is more than one (keeps order)."""
+    if len(images) <= 1:
+        return [fn(img) for img in images]
+    return list(_DECODE_POOL.map(fn, images))
+
+
+def caption_cache_key(digest: Optional[bytes]) -> Optional[tuple]:
+    """
+    Caption cache key: content hash + generation settings.
+
+    None when the image has no digest (decoded PIL images are never
+    cached) or when captions are sampled.
+    """
+    if digest is None or not _CACHE_CAPTIONS:
+        return None
+    return (digest, _MAX_NEW_TOKENS, _GEN_KWARGS["num_beams"])
+
+
+def _prepare_chunk(
+    images: List[Union[Image.Image, bytes, BinaryIO]],
+    digests: List[Optional[bytes]],
+) -> tuple:
+    """
+    CPU work for one chunk.
+
+    Images found in the pixel cache are reused as-is; the others are
+    decoded to RGB PIL and turned into (pinned) uint8 host tensors.
+
+    Returns (cached: {position: tensor}, miss_positions, host_tensors).
+    """
+    cached: Dict[int, torch.Tensor] = {}
+    misses: List[int] = []
+
+    for i, digest in enumerate(digests):
+        hit = pixel_cache.get(digest) if digest is not None else None
+        if hit is not None:
+            cached[i] = hit
+        else:
+            misses.append(i)
+
+    # Decode in parallel: PIL releases the GIL while decoding
+    pil_images = _map_images(decode_image, [images[i] for i in misses])
+    return cached, misses, _PIPELINE.to_host(pil_images)
+
+
+def _remember_pixels(pixel_values: torch.Tensor, digests: List[Optional[bytes]]) -> None:
+    """Store fresh pixel_values in the pixel cache (as CPU tensors)."""
+    if pixel_cache.maxsize <= 0:
+        return
+
+    # Pinned on CUDA so a later hit can copy back with non_blocking=True;
+    # allocating pinned directly avoids a device -> pageable -> pinned hop
+    pin = _DEVICE.type == "cuda"
+
+    for row, digest in zip(pixel_values, digests):
+        if digest is None:
+            continue
+        host = torch.empty(row.shape, dtype=row.dtype, pin_memory=pin)
+        host.copy_(row)
+        pixel_cache.put(digest, host)
+
+
+def _to_pixel_values(prepared: tuple, digests: List[Optional[bytes]]) -> torch.Tensor:
+    """Device work for one chunk: merge cache hits with freshly processed images."""
+    cached, misses, host_tensors = prepared
+
+    fresh = None
+    if misses:
+        # H2D copy (non_blocking from pinned memory) + resize/normalize
+        fresh = _PIPELINE.on_device(host_tensors)
+        _remember_pixels(fresh, [digests[i] for i in misses])
+
+    if not cached:
+        return fresh
+
+    # Some (or all) images come from the pixel cache: assemble the batch
+    sample = next(iter(cached.values()))
+    pixel_values = torch.empty(
+        (len(cached) + len(misses), *sample.shape), dtype=_DTYPE, device=_DEVICE
+    )
+    for i, tensor in cached.items():
+        pixel_values[i].copy_(tensor, non_blocking=True)
+    if fresh is not None:
+        pixel_values[misses] = fresh
+
+    return pixel_values
+
+
+def _generate(pixel_values: torch.Tensor) -> List[str]:
+    """Run BLIP generate on ready pixel_values and decode the texts."""
+    # max_new_tokens + greedy / beam / sample are pre-bound in _GEN_FAST
+    with _autocast():
+        generated_ids = _GEN_FAST(pixel_values=pixel_values)
+
+    # Decode IDs into strings
+    return [t.strip() for t in _DECODE(generated_ids)]
+
+
+@torch.inference_mode()
 def predict_caption(
-    image: Union[Image.Image, bytes, str]
+    image: Union[Image.Image, bytes, str, BinaryIO]
 ) -> str:
     """
     Predict a radiology explanation for ONE image.
@@ -105,46 +678,28 @@ def predict_caption(
         - PIL.Image.Image
         - raw bytes (FastAPI UploadFile.read())
         - path string
+        - binary file object (FastAPI UploadFile.file)
 
     Returns
     -------
     text:
         A generated caption/explanation string.
     """
-    # Ensure model is loaded
-    load_captioner()
+    # One code path for single + batch inference (cache, batching, prefetch)
+    return predict_captions([image])[0]
 
-    # Preprocess input into a clean RGB PIL image
-    pil_img = preprocess_image(image)
 
-    # Convert to BLIP inputs (processor handles resize/normalize)
-    inputs = _PROCESSOR(images=pil_img, return_tensors="pt")
-    inputs = {k: v.to(_DEVICE) for k, v in inputs.items()}
-
-    # Generate text
-    generated_ids = _MODEL.generate(
-        pixel_values=inputs["pixel_values"],
-        max_new_tokens=settings.MAX_NEW_TOKENS,
-        num_beams=settings.BEAM_SIZE,
-        do_sample=False,  # deterministic
-    )
-
-    # Decode IDs into a string
-    text = _PROCESSOR.batch_decode(
-        generated_ids,
-        skip_special_tokens=True
-    )[0]
-
-    return text.strip()
-
-
-@torch.no_grad()
+@torch.inference_mode()
 def predict_captions(
-    images: List[Union[Image.Image, bytes, str]]
+    images: List[Union[Image.Image, bytes, str, BinaryIO]]
 ) -> List[str]:
     """
     Predict explanations for a BATCH of images.
 
+    Images are processed in chunks of settings.MAX_BATCH.
+    While chunk i runs generate on the device, chunk i+1 is decoded
+    on a background CPU thread into pinned memory (pipelined).
+
     Parameters
     ----------
     images:
@@ -155,28 +710,79 @@ def predict_captions(
     texts:
         list of generated strings (same order as input).
     """
+    # Resolve cache hits first; only unseen images go to the model
+    loaded = _map_images(read_and_hash, images)
+    images = [img for img, _ in loaded]
+    digests = [digest for _, digest in loaded]
+    keys = [caption_cache_key(d) for d in digests]
+    texts: List[Optional[str]] = [
+        caption_cache.get(k) if k is not None else None for k in keys
+    ]
+
+    # Identical uploads inside one batch are generated only once:
+    # key -> positions in the input list that share it
+    misses: Dict[tuple, List[int]] = {}
+    for i, (key, text) in enumerate(zip(keys, texts)):
+        if text is None:
+            misses.setdefault(key if key is not None else ("pil", i), []).append(i)
+
+    if misses:
+        positions = list(misses.values())
+        generated = predict_uncached(
+            [images[idx[0]] for idx in positions],
+            [digests[idx[0]] for idx in positions],
+        )
+
+        for idx, text in zip(positions, generated):
+            for i in idx:
+                texts[i] = text
+            if keys[idx[0]] is not None:
+                caption_cache.put(keys[idx[0]], text)
+
+    return texts
+
+
+def predict_uncached(
+    images: List[Union[Image.Image, bytes, memoryview, BinaryIO]],
+    digests: List[Optional[bytes]],
+) -> List[str]:
+    """
+    Chunked, prefetching batch inference (no caption cache involved).
+
+    `digests` come from read_and_hash(): images whose digest is in the
+    pixel cache are not decoded again.
+    """
     # Ensure model is loaded
     load_captioner()
 
-    # Preprocess each image to PIL RGB
-    pil_images = [preprocess_image(img) for img in images]
+    if not images:
+        return []
 
-    # Batch encoding
-    inputs = _PROCESSOR(images=pil_images, return_tensors="pt")
-    inputs = {k: v.to(_DEVICE) for k, v in inputs.items()}
+    chunks = [
+        (images[i:i + _CHUNK_SIZE], digests[i:i + _CHUNK_SIZE])
+        for i in range(0, len(images), _CHUNK_SIZE)
+    ]
 
-    # Batch generation
-    generated_ids = _MODEL.generate(
-        pixel_values=inputs["pixel_values"],
-        max_new_tokens=settings.MAX_NEW_TOKENS,
-        num_beams=settings.BEAM_SIZE,
-        do_sample=False,
-    )
+    # Single chunk (the common case): nothing to overlap, stay on this thread
+    if len(chunks) == 1:
+        prepared = _prepare_chunk(*chunks[0])
+        return _generate(_to_pixel_values(prepared, chunks[0][1]))
 
-    # Decode batch
-    texts = _PROCESSOR.batch_decode(
-        generated_ids,
-        skip_special_tokens=True
-    )
+    texts: List[str] = []
+
+    # Start decoding the first chunk
+    pending = _PREFETCH_POOL.submit(_prepare_chunk, *chunks[0])
+
+    for idx in range(len(chunks)):
+        prepared = pending.result()
+
+        # Kick off CPU decode of the next chunk before using the device
+        if idx + 1 < len(chunks):
+            pending = _PREFETCH_POOL.submit(_prepare_chunk, *chunks[idx + 1])
+
+        pixel_values = _to_pixel_values(prepared, chunks[idx][1])
+
+        # Batch generation for this chunk (keeps input order)
+        texts.extend(_generate(pixel_values))
 
-    return [t.strip() for t in texts]
+    return texts
@@ -0,0 +1,307 @@
+"""
+trt_backend.py
+
+Optional TensorRT backend for the BLIP vision encoder.
+
+Why:
+- The vision encoder (ViT) is the heaviest single block of BLIP.
+- TensorRT fuses its kernels and runs them on tensor cores in fp16.
+
+How (first start):
+1) export model.vision_model to ONNX (dynamic batch axis)
+2) build an fp16 engine with `trtexec`
+3) cache the engine under ENGINE_CACHE_DIR (outside LOCAL_MODEL_DIR,
+   so the GCS model sync never sees it)
+
+Next starts reuse the cached engine (no export, no build).
+Several workers starting together build it ONCE: a file lock next to
+the engine serializes the build, and the engine is written to a temp
+file and renamed into place (never read half-written).
+The engine file name includes a model identity (config.json + weight
+file sizes / mtimes) and the weight dtype: swapping the weights under
+the same folder builds a new engine instead of replaying a stale one.
+The text decoder stays in PyTorch; only the encoder is swapped.
+
+Requirements (NOT in requirements.txt, GPU images only):
+- tensorrt Python bindings (TensorRT >= 10)
+- trtexec on PATH
+"""
+
+from __future__ import annotations
+
+import copy
+import glob
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import threading
+from typing import Tuple
+
+import torch
+from transformers.modeling_outputs import BaseModelOutputWithPooling
+
+from xplain_package.utils.exceptions import ModelLoadError
+from xplain_package.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+INPUT_NAME = "pixel_values"
+OUTPUT_NAMES = ("last_hidden_state", "pooler_output")
+
+
+class _VisionExport(torch.nn.Module):
+    """Tuple-returning wrapper so torch.onnx.export sees plain tensors."""
+
+    def __init__(self, vision_model: torch.nn.Module) -> None:
+        super().__init__()
+        self.vision_model = vision_model
+
+    def forward(self, pixel_values: torch.Tensor):
+        outputs = self.vision_model(pixel_values=pixel_values, return_dict=False)
+        return outputs[0], outputs[1]
+
+
+# Weight files whose size / mtime identify a model folder
+WEIGHT_PATTERNS = ("*.safetensors", "*.bin")
+
+
+def model_identity(model_dir: str) -> str:
+    """
+    Short hash of what the engine is built from.
+
+    config.json content + (name, size, mtime) of every weight file.
+    Stat only: no need to read hundreds of MB of weights.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+
+    config_path = os.path.join(model_dir, "config.json")
+    if os.path.isfile(config_path):
+        with open(config_path, "rb") as f:
+            digest.update(f.read())
+
+    weights = sorted(
+        path for pattern in WEIGHT_PATTERNS for path in glob.glob(os.path.join(model_dir, pattern))
+    )
+    for path in weights:
+        st = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns};".encode())
+
+    return digest.hexdigest()
+
+
+def _engine_path(
+    engine_dir: str,
+    image_size: Tuple[int, int],
+    max_batch: int,
+    model_id: str,
+    dtype: torch.dtype,
+) -> str:
+    """
+    Engines are GPU- and model-specific: GPU name, model identity and
+    weight dtype (the ONNX export starts from the live, possibly
+    half-precision weights) are all part of the file name.
+    """
+    gpu = re.sub(r"[^A-Za-z0-9]+", "_", torch.cuda.get_device_name()).strip("_")
+    height, width = image_size
+    precision = str(dtype).replace("torch.", "")
+    return os.path.join(
+        engine_dir,
+        f"blip_vision_{model_id}_{precision}_{height}x{width}_b{max_batch}_{gpu}.plan",
+    )
+
+
+def _export_onnx(vision_model: torch.nn.Module, onnx_path: str, image_size: Tuple[int, int]) -> None:
+    """Export the encoder in fp32 (TensorRT picks fp16 kernels itself)."""
+    height, width = image_size
+
+    # Export from an fp32 copy: the live model may already be fp16/bf16
+    export_model = _VisionExport(copy.deepcopy(vision_model).float()).eval()
+    device = next(export_model.parameters()).device
+    dummy = torch.zeros((1, 3, height, width), dtype=torch.float32, device=device)
+
+    logger.info(f"Exporting vision encoder to ONNX: {onnx_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            export_model,
+            (dummy,),
+            onnx_path,
+            input_names=[INPUT_NAME],
+            output_names=list(OUTPUT_NAMES),
+            dynamic_axes={
+                INPUT_NAME: {0: "batch"},
+                OUTPUT_NAMES[0]: {0: "batch"},
+                OUTPUT_NAMES[1]: {0: "batch"},
+            },
+            opset_version=17,
+        )
+
+
+def _build_engine(onnx_path: str, engine_path: str, image_size: Tuple[int, int], max_batch: int) -> None:
+    """Run trtexec to turn the ONNX graph into an fp16 engine."""
+    trtexec = shutil.which("trtexec")
+    if trtexec is None:
+        raise ModelLoadError("BACKEND=tensorrt requires `trtexec` on PATH.")
+
+    height, width = image_size
+    shape = f"{INPUT_NAME}:{{}}x3x{height}x{width}"
+
+    cmd = [
+        trtexec,
+        f"--onnx={onnx_path}",
+        f"--saveEngine={engine_path}",
+        "--fp16",
+        f"--minShapes={shape.format(1)}",
+        f"--optShapes={shape.format(1)}",
+        f"--maxShapes={shape.format(max_batch)}",
+    ]
+
+    logger.info(f"Building TensorRT engine (one-time): {engine_path}")
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ModelLoadError(f"trtexec failed:\n{result.stderr[-2000:]}")
+
+
+def _build_engine_file(
+    vision_model: torch.nn.Module,
+    engine_path: str,
+    image_size: Tuple[int, int],
+    max_batch: int,
+) -> None:
+    """
+    Export + build into per-process temp files, then rename the engine
+    into place (atomic: readers see no engine or a complete one).
+    """
+    tmp_prefix = f"{os.path.splitext(engine_path)[0]}.{os.getpid()}"
+    onnx_path = tmp_prefix + ".onnx"
+    tmp_engine = tmp_prefix + ".plan.tmp"
+
+    try:
+        _export_onnx(vision_model, onnx_path, image_size)
+        _build_engine(onnx_path, tmp_engine, image_size, max_batch)
+        os.replace(tmp_engine, engine_path)
+    finally:
+        for path in (onnx_path, tmp_engine):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class TensorRTVisionEncoder(torch.nn.Module):
+    """
+    Drop-in replacement for `model.vision_model` backed by a TRT engine.
+
+    Inputs / outputs stay torch CUDA tensors (no host copies).
+    """
+
+    def __init__(self, engine_path: str, config, hidden_size: int) -> None:
+        super().__init__()
+
+        try:
+            import tensorrt as trt
+        except ImportError as e:
+            raise ModelLoadError(
+                "BACKEND=tensorrt requires the `tensorrt` Python package."
+            ) from e
+
+        self.config = config
+        self.hidden_size = hidden_size
+
+        trt_logger = trt.Logger(trt.Logger.WARNING)
+        with open(engine_path, "rb") as f:
+            self._engine = trt.Runtime(trt_logger).deserialize_cuda_engine(f.read())
+        if self._engine is None:
+            raise ModelLoadError(f"Could not deserialize TensorRT engine: {engine_path}")
+
+        self._context = self._engine.create_execution_context()
+
+        # One execution context, shared by the batcher thread and the
+        # /predict_batch worker: shapes + addresses + enqueue must not
+        # interleave between callers
+        self._lock = threading.Lock()
+
+    def forward(self, pixel_values: torch.Tensor = None, **kwargs):
+        out_dtype = pixel_values.dtype
+        batch = pixel_values.shape[0]
+
+        # Engine I/O is fp32 (fp16 is used internally)
+        pixel_values = pixel_values.float().contiguous()
+
+        last_hidden_state = torch.empty(
+            (batch, self._num_tokens(pixel_values), self.hidden_size),
+            dtype=torch.float32,
+            device=pixel_values.device,
+        )
+        pooler_output = torch.empty(
+            (batch, self.hidden_size), dtype=torch.float32, device=pixel_values.device
+        )
+
+        with self._lock:
+            self._context.set_input_shape(INPUT_NAME, tuple(pixel_values.shape))
+            self._context.set_tensor_address(INPUT_NAME, pixel_values.data_ptr())
+            self._context.set_tensor_address(OUTPUT_NAMES[0], last_hidden_state.data_ptr())
+            self._context.set_tensor_address(OUTPUT_NAMES[1], pooler_output.data_ptr())
+            self._context.execute_async_v3(torch.cuda.current_stream().cuda_stream)
+
+        last_hidden_state = last_hidden_state.to(out_dtype)
+        pooler_output = pooler_output.to(out_dtype)
+
+        if kwargs.get("return_dict", True) is False:
+            return (last_hidden_state, pooler_output)
+
+        return BaseModelOutputWithPooling(
+            last_hidden_state=last_hidden_state,
+            pooler_output=pooler_output,
+        )
+
+    def _num_tokens(self, pixel_values: torch.Tensor) -> int:
+        """Patch tokens + [CLS] for the given input resolution."""
+        patch = self.config.patch_size
+        return (pixel_values.shape[2] // patch) * (pixel_values.shape[3] // patch) + 1
+
+
+def enable_tensorrt_vision(
+    model: torch.nn.Module,
+    engine_dir: str,
+    image_size: Tuple[int, int],
+    max_batch: int,
+    model_dir: str,
+) -> None:
+    """
+    Replace `model.vision_model` with a TensorRT engine.
+
+    Builds (and caches) the engine on first use. `model_dir` is the
+    folder the weights were loaded from (part of the engine cache key).
+    """
+    import fcntl
+
+    if not torch.cuda.is_available():
+        raise ModelLoadError("BACKEND=tensorrt requires a CUDA GPU.")
+
+    os.makedirs(engine_dir, exist_ok=True)
+    engine_path = _engine_path(
+        engine_dir,
+        image_size,
+        max_batch,
+        model_id=model_identity(model_dir),
+        dtype=next(model.vision_model.parameters()).dtype,
+    )
+
+    with open(engine_path + ".lock", "w") as lock_file:
+        # Other workers wait here, then find the finished engine
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if not os.path.isfile(engine_path):
+                _build_engine_file(model.vision_model, engine_path, image_size, max_batch)
+            else:
+                logger.info(f"Reusing cached TensorRT engine: {engine_path}")
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    vision_config = model.vision_model.config
+    model.vision_model = TensorRTVisionEncoder(
+        engine_path,
+        config=vision_config,
+        hidden_size=vision_config.hidden_size,
+    )
+    logger.info("Vision encoder now runs on TensorRT.")
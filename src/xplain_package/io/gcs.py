@@ -7,23 +7,72 @@ Rules:
 - If GCS_MODEL_URI empty -> no-op
 - If bucket is private -> ADC MUST be available, otherwise fail clearly
 - Anonymous mode is allowed only if ALLOW_PUBLIC_GCS=true
+
+Speed (cold start):
+- Objects are downloaded in parallel (XPLAIN_GCS_CONCURRENCY threads)
+- Big objects (weights) are split into byte ranges downloaded in parallel
+- A restart with an unchanged bucket skips the download entirely
+  (.manifest.json sidecar + size / CRC32C check of the local files)
+- Only inference files are fetched (XPLAIN_MODEL_FILES allowlist):
+  optimizer / scheduler states and other training artifacts are skipped,
+  and so are extra checkpoints in sub-folders (XPLAIN_SKIP_DIRS)
 """
 
 import os
 import sys
+import json
+import base64
+import fnmatch
 import shutil
-import logging
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
 from urllib.parse import urlparse
 
+import google_crc32c
 from google.cloud import storage
 from google.auth.exceptions import DefaultCredentialsError
 
 from xplain_package.config import settings
-
-
-logger = logging.getLogger("xplain_package.io.gcs")
-logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
+from xplain_package.models.blip import resolve_model_source
+from xplain_package.utils.logging import get_logger
+
+
+# Own handler (LOG_LEVEL): logs show up both from the CLI and when the
+# API downloads in-process (MODEL_DOWNLOAD_IN_APP)
+logger = get_logger("xplain_package.io.gcs")
+
+# Parallel download threads (GCS handles many concurrent reads well)
+GCS_CONCURRENCY = int(os.getenv("XPLAIN_GCS_CONCURRENCY", "16"))
+
+# Objects bigger than this are fetched as RANGED_CHUNKS parallel byte ranges
+RANGED_THRESHOLD = 150 * 1024 * 1024
+RANGED_CHUNKS = 32
+
+# File-name patterns needed for inference (comma-separated, "*" = everything).
+# Covers config / tokenizer / processor files and (sharded) weights, but not
+# optimizer.pt, scheduler.pt, rng_state.pth, training_args.bin, ...
+MODEL_FILES = [
+    pattern.strip()
+    for pattern in os.getenv(
+        "XPLAIN_MODEL_FILES",
+        "*.json,*.txt,*.safetensors,pytorch_model*.bin,*.model",
+    ).split(",")
+    if pattern.strip()
+]
+
+# Sub-folder patterns (relative to the prefix) never downloaded. Trainer
+# output folders often hold extra checkpoint-*/ copies of the weights
+# next to the final model; their files would match MODEL_FILES too.
+SKIP_DIRS = [
+    pattern.strip()
+    for pattern in os.getenv("XPLAIN_SKIP_DIRS", "checkpoint-*").split(",")
+    if pattern.strip()
+]
+
+# Written into LOCAL_MODEL_DIR after a successful download
+MANIFEST_NAME = ".manifest.json"
+CRC_CHUNK_SIZE = 8 * 1024 * 1024
 
 
 def parse_gs_uri(gs_uri: str):
@@ -78,23 +127,254 @@ def _make_client():
         )
 
 
-def download_prefix(bucket_name: str, prefix: str, dest_dir: Path):
-    client = _make_client()
+def _download_range(blob, target: Path, start: int, end: int) -> None:
+    """
+    Stream bytes [start, end] of blob into the same offset of target.
+
+    Each range has its own file handle (own offset), and the response is
+    written as it arrives: memory stays flat even for multi-GB weights.
+    """
+    with open(target, "r+b") as f:
+        f.seek(start)
+        # Ranged reads cannot be checksummed against the whole object
+        blob.download_to_file(f, start=start, end=end, checksum=None)
+
+
+def _download_tasks(blob, target: Path) -> list:
+    """
+    Split one blob into download tasks (callables).
+
+    Small blobs: one download_to_filename.
+    Big blobs: the target is preallocated, then each task streams one
+    byte range into its own slice of the file (no locking).
+    """
+    if not blob.size or blob.size <= RANGED_THRESHOLD:
+        return [lambda: blob.download_to_filename(str(target))]
+
+    with open(target, "wb") as f:
+        os.ftruncate(f.fileno(), blob.size)
+
+    chunk = -(-blob.size // RANGED_CHUNKS)  # ceil division
+    return [
+        (lambda start=start: _download_range(
+            blob, target, start, min(start + chunk, blob.size) - 1
+        ))
+        for start in range(0, blob.size, chunk)
+    ]
+
+
+def _relative_name(blob_name: str, prefix: str) -> str:
+    """Path of a blob relative to the downloaded prefix."""
+    return blob_name[len(prefix):].lstrip("/") if blob_name != prefix else Path(blob_name).name
+
+
+def _remote_manifest(blobs, prefix: str) -> dict:
+    """relative path -> {crc32c, size, generation} for the listed blobs."""
+    return {
+        _relative_name(blob.name, prefix): {
+            "crc32c": blob.crc32c,
+            "size": blob.size,
+            "generation": blob.generation,
+        }
+        for blob in blobs
+    }
+
+
+def _file_crc32c(path: Path) -> str:
+    """Base64 CRC32C of a local file (same encoding as blob.crc32c)."""
+    checksum = google_crc32c.Checksum()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CRC_CHUNK_SIZE), b""):
+            checksum.update(chunk)
+    return base64.b64encode(checksum.digest()).decode("ascii")
+
+
+def is_up_to_date(dest_dir: Path, remote: dict) -> bool:
+    """
+    True if dest_dir already holds exactly these objects.
+
+    1) the sidecar manifest from the last download equals `remote`
+       (same objects, same generations)
+    2) every file exists with the right size
+    3) every file's CRC32C matches (catches partial / corrupted files;
+       hardware-accelerated, files checked in parallel)
+    """
+    manifest_path = dest_dir / MANIFEST_NAME
+    if not manifest_path.is_file():
+        return False
+
+    try:
+        local = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        return False
+
+    if local != remote:
+        return False
+
+    for rel, meta in remote.items():
+        path = dest_dir / rel
+        if not path.is_file() or path.stat().st_size != meta["size"]:
+            return False
+
+    to_check = [(dest_dir / rel, meta["crc32c"]) for rel, meta in remote.items() if meta["crc32c"]]
+    with ThreadPoolExecutor(max_workers=max(1, GCS_CONCURRENCY)) as pool:
+        crcs = list(pool.map(_file_crc32c, [path for path, _ in to_check]))
+
+    return all(crc == expected for crc, (_, expected) in zip(crcs, to_check))
+
+
+def _is_model_file(blob_name: str, prefix: str) -> bool:
+    """
+    True if the object is needed for inference.
+
+    Judged on its path relative to the prefix: no folder on the way may
+    match SKIP_DIRS, and the file name must match MODEL_FILES.
+    """
+    *folders, name = PurePosixPath(_relative_name(blob_name, prefix)).parts
+    if any(fnmatch.fnmatch(folder, pattern) for folder in folders for pattern in SKIP_DIRS):
+        return False
+    return any(fnmatch.fnmatch(name, pattern) for pattern in MODEL_FILES)
+
+
+def iter_prefix(client, bucket_name: str, prefix: str):
+    """
+    Yield the model blobs under gs://bucket_name/prefix as they are listed.
+
+    list_blobs pages lazily, so callers can start downloading after the
+    first page. Raises (at the end) if nothing matched.
+    """
     bucket = client.bucket(bucket_name)
 
-    blobs = list(client.list_blobs(bucket, prefix=prefix))
-    if not blobs:
+    listed = 0
+    kept = 0
+    skipped_bytes = 0
+    skipped_names = []
+
+    for blob in client.list_blobs(bucket, prefix=prefix):
+        listed += 1
+        if _is_model_file(blob.name, prefix):
+            kept += 1
+            yield blob
+        else:
+            skipped_bytes += blob.size or 0
+            skipped_names.append(_relative_name(blob.name, prefix))
+
+    if not listed:
         raise FileNotFoundError(f"No objects found at gs://{bucket_name}/{prefix}")
 
+    if skipped_names:
+        logger.info(
+            f"Skipped {len(skipped_names)} non-inference objects "
+            f"({skipped_bytes / (1024 * 1024):.1f} MB), e.g. {skipped_names[0]} "
+            "(XPLAIN_MODEL_FILES / XPLAIN_SKIP_DIRS)"
+        )
+
+    if not kept:
+        raise FileNotFoundError(
+            f"No model files matching XPLAIN_MODEL_FILES at gs://{bucket_name}/{prefix}"
+        )
+
+
+def list_prefix(client, bucket_name: str, prefix: str) -> list:
+    """List the model blobs under gs://bucket_name/prefix (raises if empty)."""
+    return list(iter_prefix(client, bucket_name, prefix))
+
+
+def download_prefix(bucket_name: str, prefix: str, dest_dir: Path, blobs=None):
+    """
+    Download every model blob under the prefix into dest_dir.
+
+    blobs=None streams the listing: each blob is queued for download as
+    soon as its listing page arrives (no list-everything-first round trip).
+    At most MAX_PENDING tasks wait in the pool queue at any time.
+    """
+    if blobs is None:
+        blobs = iter_prefix(_make_client(), bucket_name, prefix)
+
     dest_dir.mkdir(parents=True, exist_ok=True)
 
-    for blob in blobs:
-        rel = blob.name[len(prefix):].lstrip("/") if blob.name != prefix else Path(blob.name).name
-        target = dest_dir / rel
-        target.parent.mkdir(parents=True, exist_ok=True)
+    workers = max(1, GCS_CONCURRENCY)
+    pending = threading.BoundedSemaphore(4 * workers)
+    downloaded = []
+    futures = []
+
+    def _run(task):
+        try:
+            task()
+        finally:
+            pending.release()
+
+    # Every blob (or byte range of a big blob) is one task on ONE pool,
+    # so many small files and a few huge ones share the same workers
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for blob in blobs:
+            target = dest_dir / _relative_name(blob.name, prefix)
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+            logger.info(f"Downloading gs://{bucket_name}/{blob.name} -> {target}")
+            downloaded.append(blob)
 
-        logger.info(f"Downloading gs://{bucket_name}/{blob.name} -> {target}")
-        blob.download_to_filename(str(target))
+            for task in _download_tasks(blob, target):
+                pending.acquire()  # back-pressure on the listing
+                futures.append(pool.submit(_run, task))
+
+        # .result() re-raises the first download error
+        for future in futures:
+            future.result()
+
+    # Only after EVERY object landed: marks the folder as complete
+    manifest = _remote_manifest(downloaded, prefix)
+    (dest_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def convert_to_safetensors(model_dir: Path) -> bool:
+    """
+    Convert pytorch_model.bin -> model.safetensors ONCE, after download.
+
+    safetensors files are memory-mapped at load time (no pickle, no
+    full copy in RAM), which cuts model load time on every cold start.
+    Transformers prefers model.safetensors when both files exist.
+
+    Returns True if a conversion happened.
+    """
+    bin_path = model_dir / "pytorch_model.bin"
+    st_path = model_dir / "model.safetensors"
+    if not bin_path.is_file() or st_path.exists():
+        return False
+
+    # Heavy imports only when there is something to convert
+    import torch
+    from safetensors.torch import save_file
+
+    logger.info(f"Converting {bin_path.name} -> {st_path.name}")
+    state_dict = torch.load(str(bin_path), map_location="cpu", weights_only=True)
+
+    # safetensors refuses shared storage (tied embeddings): clone repeats
+    seen = set()
+    tensors = {}
+    for name, tensor in state_dict.items():
+        ptr = tensor.untyped_storage().data_ptr()
+        tensors[name] = tensor.contiguous() if ptr not in seen else tensor.clone().contiguous()
+        seen.add(ptr)
+
+    # Write then rename: a half-written file must never shadow the .bin
+    tmp_path = st_path.with_suffix(".safetensors.tmp")
+    save_file(tensors, str(tmp_path), metadata={"format": "pt"})
+    os.replace(tmp_path, st_path)
+    return True
+
+
+def convert_model_folder(local_model_dir: Path) -> bool:
+    """
+    convert_to_safetensors on the folder the loader will actually use.
+
+    LOCAL_MODEL_DIR is often the PARENT of the model folder (e.g.
+    models/cxiu_blip_baseline/): resolve it the same way get_model does.
+    """
+    model_dir = resolve_model_source(
+        str(local_model_dir), preferred_names=(settings.MODEL_FAMILY.lower(),)
+    )
+    return convert_to_safetensors(Path(model_dir))
 
 
 def main():
@@ -110,18 +390,39 @@ def main():
 
     bucket_name, prefix = parse_gs_uri(gs_uri)
 
-    if local_model_dir.exists():
-        logger.info(f"Cleaning existing local model dir: {local_model_dir}")
-        shutil.rmtree(local_model_dir)
-
     try:
-        download_prefix(bucket_name, prefix, local_model_dir)
-        logger.info("GCS download complete.")
-        return 0
+        client = _make_client()
+
+        if not local_model_dir.exists():
+            # Fresh container: stream the listing straight into downloads
+            blobs = iter_prefix(client, bucket_name, prefix)
+        else:
+            # Existing copy: the full listing is needed to compare it
+            blobs = list_prefix(client, bucket_name, prefix)
+
+            # Same revision restarting: the local copy is already complete
+            if is_up_to_date(local_model_dir, _remote_manifest(blobs, prefix)):
+                logger.info("Local model dir matches the bucket. Skipping download.")
+                blobs = None
+            else:
+                logger.info(f"Cleaning existing local model dir: {local_model_dir}")
+                shutil.rmtree(local_model_dir)
+
+        if blobs is not None:
+            download_prefix(bucket_name, prefix, local_model_dir, blobs=blobs)
+            logger.info("GCS download complete.")
     except Exception as e:
         logger.exception(f"GCS download failed: {e}")
         return 1
 
+    # Best effort: a failed conversion still leaves a loadable .bin
+    try:
+        convert_model_folder(local_model_dir)
+    except Exception as e:
+        logger.warning(f"safetensors conversion skipped: {e}")
+
+    return 0
+
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -10,7 +10,7 @@ Inference-only BLIP wrapper.
     2) OR from a folder that was downloaded from GCS into LOCAL_MODEL_DIR.
 
 Therefore:
-- We set Hugging Face offline mode.
+- We set Hugging Face offline mode (Dockerfile ENV, and forced at import).
 - We call from_pretrained(..., local_files_only=True).
 - We REMOVE any HF fallback logic.
 - If no valid local model is found -> we raise an error and crash startup.
@@ -29,35 +29,110 @@ Expected local folder structure (created by save_pretrained):
 # ============================================================
 
 import os  # for path checks and offline env vars
+import stat  # file type checks from a single os.stat
+from functools import lru_cache  # memoize local model resolution
 from dataclasses import dataclass  # convenient container for model + processor
-from typing import List, Optional  # type hints for clarity
+from typing import List, Optional, Tuple  # type hints for clarity
+
+# ============================================================
+# Global "OFFLINE" enforcement for Transformers / HF
+# ============================================================
+# These environment variables make Hugging Face libraries refuse network calls.
+# Even if someone accidentally reintroduces HF fallback later,
+# Transformers will not download anything.
+#
+# Forced to "1" (an inherited "0" must not win) and set BEFORE the
+# transformers import below, because huggingface_hub reads them at import.
+# The Docker image also sets them (ENV in Dockerfile) for earlier imports.
+
+os.environ["TRANSFORMERS_OFFLINE"] = "1"
+os.environ["HF_HUB_OFFLINE"] = "1"
+os.environ["HF_DATASETS_OFFLINE"] = "1"
 
 # ============================================================
 # Third-party imports
 # ============================================================
 
-import torch  # device + no_grad inference
+import torch  # device + inference_mode
 from transformers import BlipForConditionalGeneration, AutoProcessor  # BLIP baseline classes
 
 # ============================================================
 # Project imports
 # ============================================================
 
+from xplain_package.data.transforms import TensorImagePipeline  # fused resize + normalize
+from xplain_package.utils.exceptions import ModelLoadError  # clear load failures
 from xplain_package.utils.logging import get_logger  # central logger helper
 
 
+# Create logger for this module
+logger = get_logger(__name__)
+
+
 # ============================================================
-# Global "OFFLINE" enforcement for Transformers / HF
+# Quantization helpers
 # ============================================================
-# These environment variables make Hugging Face libraries refuse network calls.
-# Even if someone accidentally reintroduces HF fallback later,
-# Transformers will not download anything.
 
-os.environ["TRANSFORMERS_OFFLINE"] = "1"
-os.environ["HF_DATASETS_OFFLINE"] = "1"
+SUPPORTED_QUANTIZATION = ("none", "int8", "int4")
+SUPPORTED_QUANTIZE_TARGETS = ("all", "text_decoder")
 
-# Create logger for this module
-logger = get_logger(__name__)
+# Modules kept unquantized when only the text decoder is quantized
+_TEXT_DECODER_ONLY_SKIP = ["vision_model"]
+
+
+def _bnb_config(quantization: str, target: str = "all"):
+    """
+    Build a bitsandbytes config for GPU quantized loading.
+
+    bitsandbytes is optional (GPU-only), so we import lazily and fail
+    with a clear message if it is missing.
+    """
+    try:
+        import bitsandbytes  # noqa: F401  (only checks availability)
+        from transformers import BitsAndBytesConfig
+    except ImportError as e:
+        raise ModelLoadError(
+            f"QUANTIZATION={quantization} on GPU requires bitsandbytes. "
+            "Install it (pip install bitsandbytes) or set QUANTIZATION=none."
+        ) from e
+
+    # Same skip list works for 4-bit too (transformers reuses it)
+    skip = _TEXT_DECODER_ONLY_SKIP if target == "text_decoder" else None
+
+    if quantization == "int8":
+        return BitsAndBytesConfig(load_in_8bit=True, llm_int8_skip_modules=skip)
+
+    return BitsAndBytesConfig(
+        load_in_4bit=True,
+        bnb_4bit_compute_dtype=torch.float16,
+        llm_int8_skip_modules=skip,
+    )
+
+
+def _quantize_dynamic_cpu(model, quantization: str, target: str = "all"):
+    """
+    Post-training dynamic INT8 quantization of nn.Linear layers (CPU only).
+
+    Weights are stored as int8, activations are quantized on the fly.
+    PyTorch has no dynamic int4 kernel, so int4 falls back to int8.
+    target="text_decoder" quantizes the decoder only.
+    """
+    if quantization == "int4":
+        logger.warning("int4 is not available on CPU; using dynamic int8 instead.")
+
+    if target == "text_decoder":
+        model.text_decoder = torch.ao.quantization.quantize_dynamic(
+            model.text_decoder,
+            {torch.nn.Linear},
+            dtype=torch.qint8,
+        )
+        return model
+
+    return torch.ao.quantization.quantize_dynamic(
+        model,
+        {torch.nn.Linear},
+        dtype=torch.qint8,
+    )
 
 
 # ============================================================
@@ -77,17 +152,25 @@ class BlipCaptioner:
         Vision encoder + text decoder.
     device : torch.device
         CPU or GPU used for inference.
+    pipeline : TensorImagePipeline, optional
+        Batched resize + normalize built from the processor settings
+        (fused Numba kernel on CPU). None -> use the HF processor.
     """
 
     processor: AutoProcessor
     model: BlipForConditionalGeneration
     device: torch.device
+    pipeline: Optional[TensorImagePipeline] = None
 
     @classmethod
     def from_pretrained(
         cls,
         model_source: str,
         device: torch.device,
+        quantization: str = "none",
+        dtype: torch.dtype = torch.float32,
+        fast_preproc: bool = True,
+        quantize_target: str = "all",
     ) -> "BlipCaptioner":
         """
         Load BLIP ONLY from a LOCAL folder.
@@ -98,6 +181,14 @@ class BlipCaptioner:
             Path to the local folder containing config.json, weights, etc.
         device : torch.device
             "cpu" or "cuda"
+        quantization : str
+            "none" | "int8" | "int4" (see config.QUANTIZATION)
+        dtype : torch.dtype
+            Weight dtype (fp16 / bf16 on GPU, see config.PRECISION)
+        fast_preproc : bool
+            CPU only: fused Numba preprocessing (see config.FAST_PREPROC)
+        quantize_target : str
+            "all" | "text_decoder" (see config.QUANTIZE_TARGET)
 
         Returns
         -------
@@ -127,20 +218,69 @@ class BlipCaptioner:
             trust_remote_code=False  # extra safety
         )
 
+        if quantization not in SUPPORTED_QUANTIZATION:
+            raise ValueError(
+                f"Unknown QUANTIZATION='{quantization}'. "
+                f"Expected one of: {list(SUPPORTED_QUANTIZATION)}"
+            )
+
+        if quantize_target not in SUPPORTED_QUANTIZE_TARGETS:
+            raise ValueError(
+                f"Unknown QUANTIZE_TARGET='{quantize_target}'. "
+                f"Expected one of: {list(SUPPORTED_QUANTIZE_TARGETS)}"
+            )
+
+        # Weights are loaded straight onto `device` in their final dtype:
+        # - low_cpu_mem_usage: no random init + no second full copy in RAM
+        # - device_map: each tensor goes to the device as it is read
+        #   (no CPU-materialize-then-.to(device) round trip)
+        # - model.safetensors (if present) is memory-mapped, not unpickled
+        extra_kwargs = {
+            "low_cpu_mem_usage": True,
+            "device_map": {"": device},
+        }
+
+        # bitsandbytes loads weights directly onto the GPU in 8/4-bit
+        gpu_quantized = device.type == "cuda" and quantization != "none"
+        if gpu_quantized:
+            extra_kwargs["quantization_config"] = _bnb_config(quantization, quantize_target)
+        else:
+            extra_kwargs["torch_dtype"] = dtype
+
         # Model loads ONLY from local folder
         model = BlipForConditionalGeneration.from_pretrained(
             model_source,
             local_files_only=True,   # 🚫 forbids downloading
-            trust_remote_code=False
+            trust_remote_code=False,
+            **extra_kwargs,
         )
 
-        # Move model to chosen device (CPU/GPU)
-        model.to(device)
+        if gpu_quantized:
+            logger.info(
+                f"Loaded BLIP with bitsandbytes {quantization} weights ({quantize_target})."
+            )
+
+        # CPU: dynamic INT8 on Linear layers (~2x faster matmuls)
+        elif device.type == "cpu" and quantization != "none":
+            model = _quantize_dynamic_cpu(model, quantization, quantize_target)
+            logger.info(f"Applied dynamic INT8 quantization (CPU, {quantize_target}).")
 
         # Set inference mode
         model.eval()
 
-        return cls(processor=processor, model=model, device=device)
+        # Reuse past keys/values between decode steps (KV cache)
+        model.generation_config.use_cache = True
+
+        # Read resize / mean / std from the processor ONCE; the pipeline
+        # replaces the per-call processor(images=...) on the hot path
+        pipeline = TensorImagePipeline.from_processor(
+            processor.image_processor,
+            device=device,
+            dtype=model.dtype,
+            fast_cpu=fast_preproc,
+        )
+
+        return cls(processor=processor, model=model, device=device, pipeline=pipeline)
 
     def generate(
         self,
@@ -169,37 +309,99 @@ class BlipCaptioner:
             Generated radiology explanation.
         """
 
-        # Convert PIL image -> BLIP tensors
-        encoding = self.processor(images=image, return_tensors="pt")
+        return self.generate_batch(
+            [image],
+            max_length=max_length,
+            num_beams=num_beams,
+            do_sample=do_sample,
+        )[0]
+
+    def generate_batch(
+        self,
+        images: List,
+        max_length: int = 128,
+        num_beams: int = 3,
+        do_sample: bool = False,
+    ) -> List[str]:
+        """
+        Generate captions for SEVERAL PIL images in one generate call.
 
-        # Move tensors to same device as model
-        encoding = encoding.to(self.device)
+        All images are resized to the processor size, so they stack
+        into one (N, 3, H, W) tensor: the encoder and decoder run once
+        for the whole batch instead of once per image.
 
-        # Disable gradients for speed and memory
-        with torch.no_grad():
+        Parameters
+        ----------
+        images : list[PIL.Image.Image]
+            Input X-rays (PIL objects).
+        max_length, num_beams, do_sample :
+            Same as generate().
+
+        Returns
+        -------
+        list[str]
+            One generated explanation per image, in input order.
+        """
+
+        if not images:
+            return []
+
+        # Convert PIL images -> ONE stacked BLIP tensor on the model device
+        if self.pipeline is not None:
+            pixel_values = self.pipeline(images)
+        else:
+            # Image processor directly: skips the AutoProcessor wrapper
+            # (argument validation + BatchFeature merging per call)
+            encoding = self.processor.image_processor(images, return_tensors="pt")
+            pixel_values = encoding["pixel_values"]
+
+            # Pinned source -> asynchronous host-to-device copy
+            if self.device.type == "cuda":
+                pixel_values = pixel_values.pin_memory().to(self.device, non_blocking=True)
+            else:
+                pixel_values = pixel_values.to(self.device)
+
+        # No autograd at all: inference_mode also skips version counters
+        # and view tracking (cheaper than no_grad for many small decode ops)
+        with torch.inference_mode():
             generated_ids = self.model.generate(
-                pixel_values=encoding["pixel_values"],
+                pixel_values=pixel_values,
                 max_length=max_length,
                 num_beams=num_beams,
                 do_sample=do_sample,
             )
 
-        # Decode tokens -> text
-        generated_text = self.processor.batch_decode(
+        # Decode tokens -> text (one string per image)
+        return self.processor.tokenizer.batch_decode(
             generated_ids,
             skip_special_tokens=True
-        )[0]
-
-        return generated_text
+        )
 
 
 # ============================================================
 # Local model resolution (NO HF fallback)
 # ============================================================
 
+# Error messages, built once (%-templates filled only when raising)
+_MSG_EMPTY = (
+    "LOCAL_MODEL_DIR is empty. "
+    "Set it to a local folder containing your finetuned BLIP model."
+)
+_MSG_AMBIGUOUS = (
+    "Multiple pretrained model folders found inside %s: %s. "
+    "Set LOCAL_MODEL_DIR to the exact folder you want."
+)
+_MSG_NONE_FOUND = (
+    "No valid local pretrained model found in: %s. "
+    "HF / internet fallback is disabled. "
+    "Either mount your models folder OR set GCS_MODEL_URI so entrypoint downloads it."
+)
+
+
 def resolve_model_source(
     local_model_dir: str,
     hf_model_name: Optional[str] = None,
+    preferred_names: Tuple[str, ...] = (),
 ) -> str:
     """
     Decide where to load the model from, STRICTLY locally.
@@ -207,12 +409,18 @@ def resolve_model_source(
     Rules:
     1) If local_model_dir is a valid pretrained folder (config.json exists),
        return it.
-    2) If local_model_dir is a parent folder, search ONE level down for valid
-       pretrained folders.
+    2) If local_model_dir is a parent folder and a child with a conventional
+       name (preferred_names, e.g. the model family "blip") is a valid
+       pretrained folder, return it without listing the parent.
+       Otherwise search ONE level down for valid pretrained folders.
        - If exactly ONE is found, return it.
        - If multiple are found, raise (no guessing).
     3) If nothing valid locally, raise (NO HF fallback allowed).
 
+    The result is memoized per local_model_dir: the model folder does not
+    change while the process runs, so the filesystem is walked only once.
+    Call clear_model_cache() to forget it (e.g. in tests).
+
     Parameters
     ----------
     local_model_dir : str
@@ -220,6 +428,8 @@ def resolve_model_source(
     hf_model_name : Optional[str]
         Kept only for backward compatibility with old registry calls.
         It is NOT used anymore.
+    preferred_names : Tuple[str, ...]
+        Child folder names checked first (one stat each) in Case 2.
 
     Returns
     -------
@@ -233,65 +443,96 @@ def resolve_model_source(
     RuntimeError
         If multiple valid models are found (ambiguous).
     """
+    # hf_model_name is ignored, so it must not be part of the cache key
+    return _resolve_cached(local_model_dir, tuple(preferred_names))
+
+
+def clear_model_cache() -> None:
+    """Forget resolved model folders (tests, or after a fresh download)."""
+    _resolve_cached.cache_clear()
+
+
+def _has_config(folder: str) -> bool:
+    """ONE stat: a regular config.json inside implies the folder exists."""
+    # os.access(path, os.R_OK) is not cheaper: it is also one syscall with
+    # the same path walk, and it cannot tell a file from a directory named
+    # config.json. stat + S_ISREG keeps the file-type check for free.
+    try:
+        return stat.S_ISREG(os.stat(f"{folder}{os.sep}config.json").st_mode)
+    except OSError:
+        return False
+
+
+@lru_cache(maxsize=None)
+def _resolve_cached(local_model_dir: str, preferred_names: Tuple[str, ...] = ()) -> str:
+    """Uncached body of resolve_model_source (one entry per folder)."""
 
     # If no local dir provided, this is a fatal configuration error
     if not local_model_dir:
-        raise FileNotFoundError(
-            "LOCAL_MODEL_DIR is empty. "
-            "Set it to a local folder containing your finetuned BLIP model."
-        )
+        raise FileNotFoundError(_MSG_EMPTY)
 
     # ------------------------------------------------------------
     # Case 1) local_model_dir is already a pretrained folder
     # ------------------------------------------------------------
-    config_path = os.path.join(local_model_dir, "config.json")
-
-    if os.path.isdir(local_model_dir) and os.path.isfile(config_path):
+    if _has_config(local_model_dir):
         logger.info(
-            f"Local model directory looks valid (config.json found): {local_model_dir}"
+            "Local model directory looks valid (config.json found): %s", local_model_dir
         )
         return local_model_dir
 
     # ------------------------------------------------------------
     # Case 2) local_model_dir is parent folder -> search children
     # ------------------------------------------------------------
-    if os.path.isdir(local_model_dir):
-
-        # List everything inside parent folder
-        children = os.listdir(local_model_dir)
-
-        # Look for child folders containing config.json
-        candidate_folders: List[str] = []
-
-        for child in children:
-            child_path = os.path.join(local_model_dir, child)
-            child_config = os.path.join(child_path, "config.json")
-
-            if os.path.isdir(child_path) and os.path.isfile(child_config):
-                candidate_folders.append(child_path)
+    # No separate isdir() here: the stats / scandir below fail on their
+    # own when local_model_dir is missing or is not a folder.
+
+    # Conventional names first: a hit skips listing the parent
+    for name in preferred_names:
+        child = os.path.join(local_model_dir, name)
+        if _has_config(child):
+            logger.info("Found conventional model folder: %s", child)
+            return child
+
+    # Look for child folders containing config.json
+    candidate_folders: List[str] = []
+
+    # scandir: is_dir(follow_symlinks=False) is answered from d_type in
+    # the directory listing itself (no stat per child, unlike
+    # listdir + isdir). Only symlinks pay a stat, so symlinked model
+    # folders keep working. The config.json check is the one syscall
+    # left per directory.
+    try:
+        entries = os.scandir(local_model_dir)
+    except (FileNotFoundError, NotADirectoryError):
+        entries = None
+
+    if entries is not None:
+        with entries:
+            for entry in entries:
+                is_dir = entry.is_dir(follow_symlinks=False) or (
+                    entry.is_symlink() and entry.is_dir()
+                )
+                if is_dir and _has_config(entry.path):
+                    candidate_folders.append(entry.path)
+
+    # Directory order is arbitrary: keep messages deterministic
+    candidate_folders.sort()
+
+    # Exactly one valid model -> choose it
+    if len(candidate_folders) == 1:
+        chosen = candidate_folders[0]
+        logger.info(
+            "Found one valid pretrained model folder inside %s: %s",
+            local_model_dir,
+            chosen,
+        )
+        return chosen
 
-        # Exactly one valid model -> choose it
-        if len(candidate_folders) == 1:
-            chosen = candidate_folders[0]
-            logger.info(
-                f"Found one valid pretrained model folder inside "
-                f"{local_model_dir}: {chosen}"
-            )
-            return chosen
-
-        # Multiple valid models -> ambiguous, crash
-        if len(candidate_folders) > 1:
-            raise RuntimeError(
-                f"Multiple pretrained model folders found inside {local_model_dir}: "
-                f"{candidate_folders}. "
-                f"Set LOCAL_MODEL_DIR to the exact folder you want."
-            )
+    # Multiple valid models -> ambiguous, crash
+    if len(candidate_folders) > 1:
+        raise RuntimeError(_MSG_AMBIGUOUS % (local_model_dir, candidate_folders))
 
     # ------------------------------------------------------------
     # Case 3) nothing valid locally -> fatal error (NO HF)
     # ------------------------------------------------------------
-    raise FileNotFoundError(
-        f"No valid local pretrained model found in: {local_model_dir}. "
-        "HF / internet fallback is disabled. "
-        "Either mount your models folder OR set GCS_MODEL_URI so entrypoint downloads it."
-    )
+    raise FileNotFoundError(_MSG_NONE_FOUND % local_model_dir)
@@ -22,7 +22,9 @@ So the loading logic is:
 # Standard library imports
 # ============================================================
 
-from typing import Any  # generic types for settings compatibility
+import threading  # serialize concurrent cold-starts
+from functools import lru_cache  # memoize device resolution
+from typing import Any, Dict, Optional, Tuple  # generic types for settings compatibility
 
 # ============================================================
 # Third-party imports
@@ -41,15 +43,27 @@ from xplain_package.models.blip import (
     BlipCaptioner,       # inference wrapper
     resolve_model_source # local model discovery (NO HF fallback)
 )
+from xplain_package.models.blip import clear_model_cache as _clear_resolved_sources
 
 # Create module logger
 logger = get_logger(__name__)
 
+# Loaded wrappers, one per (family, folder, device, load options).
+# Loading reads hundreds of MB of weights: do it once per process.
+_MODEL_CACHE: Dict[Tuple, Any] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
 
 # ============================================================
 # Helper: device resolution
 # ============================================================
 
+# Shared device objects for the common cases (building them does NOT
+# touch the CUDA driver; is_available() is only probed for "auto")
+_CPU = torch.device("cpu")
+_CUDA = torch.device("cuda")
+
+
 def get_device(settings: Any) -> torch.device:
     """
     Decide which device to use.
@@ -59,7 +73,7 @@ def get_device(settings: Any) -> torch.device:
     - different machines may or may not have CUDA
 
     Priority:
-    1) If settings.DEVICE exists, use it ("cpu" or "cuda")
+    1) If settings.DEVICE exists (and is not "auto"), use it ("cpu" or "cuda")
     2) Else use CUDA if available
     3) Else CPU
 
@@ -75,14 +89,61 @@ def get_device(settings: Any) -> torch.device:
     """
 
     # Try to use an explicit DEVICE from settings if present
-    device_str = getattr(settings, "DEVICE", None)
+    return _resolve_device_cached(getattr(settings, "DEVICE", None))
+
+
+@lru_cache(maxsize=None)
+def _resolve_device_cached(device_str: Optional[str]) -> torch.device:
+    """
+    DEVICE string -> torch.device, computed once per value.
 
-    if device_str:
+    torch.cuda.is_available() is only probed the first time "auto" is
+    seen; the key space ("auto", "cpu", "cuda", None, ...) stays tiny.
+    """
+    if device_str and device_str.lower() != "auto":
         # Respect explicit configuration
-        return torch.device(device_str)
+        name = device_str.lower()
+        if name == "cpu":
+            return _CPU
+        if name == "cuda":
+            return _CUDA
+
+        # Exotic forms ("cuda:1", ...): fail early with a clear message
+        try:
+            return torch.device(device_str)
+        except RuntimeError as e:
+            raise ValueError(
+                f"Unknown DEVICE='{device_str}'. Expected: auto | cpu | cuda | cuda:N."
+            ) from e
 
     # Otherwise auto-detect
-    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    return _CUDA if torch.cuda.is_available() else _CPU
+
+
+def get_dtype(settings: Any, device: torch.device) -> torch.dtype:
+    """
+    Map settings.PRECISION to the weight dtype.
+
+    Reduced precision is only used on CUDA: on CPU, fp16/bf16 matmuls
+    are usually slower than fp32, so we always stay in fp32 there.
+    """
+    precision = getattr(settings, "PRECISION", "auto")
+
+    if device.type != "cuda" or precision == "fp32":
+        return torch.float32
+
+    if precision == "fp16":
+        return torch.float16
+
+    if precision == "bf16":
+        return torch.bfloat16
+
+    if precision == "auto":
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+
+    raise ValueError(
+        f"Unknown PRECISION='{precision}'. Expected: auto | fp32 | fp16 | bf16."
+    )
 
 
 # ============================================================
@@ -124,27 +185,49 @@ def get_model(settings: Any):
     local_model_dir = getattr(settings, "LOCAL_MODEL_DIR", None)
 
     # Log what we are about to do
-    logger.info(f"Model family requested: {model_family}")
-    logger.info(f"Local model directory: {local_model_dir}")
+    # (%-style args: formatted only if INFO is enabled)
+    logger.info("Model family requested: %s", model_family)
+    logger.info("Local model directory: %s", local_model_dir)
 
     # Choose device
     device = get_device(settings)
-    logger.info(f"Inference device: {device}")
+    logger.info("Inference device: %s", device)
 
     # ------------------------------------------------------------
     # BLIP FAMILY (offline only)
     # ------------------------------------------------------------
     if model_family == "blip":
 
-        # Resolve to a real local pretrained folder
-        # This raises if nothing valid is found.
-        model_source = resolve_model_source(local_model_dir)
-
-        # Load BLIP strictly from local files
-        return BlipCaptioner.from_pretrained(
-            model_source=model_source,
-            device=device,
+        # Everything that changes the loaded weights is part of the key
+        load_kwargs = dict(
+            quantization=getattr(settings, "QUANTIZATION", "none"),
+            dtype=get_dtype(settings, device),
+            fast_preproc=getattr(settings, "FAST_PREPROC", True),
+            quantize_target=getattr(settings, "QUANTIZE_TARGET", "all"),
         )
+        key = (model_family, local_model_dir, str(device), *sorted(load_kwargs.items()))
+
+        # One lock for all keys: concurrent cold-starts load only once
+        with _MODEL_CACHE_LOCK:
+            captioner = _MODEL_CACHE.get(key)
+            if captioner is not None:
+                logger.info("Reusing already loaded model.")
+                return captioner
+
+            # Resolve to a real local pretrained folder
+            # This raises if nothing valid is found.
+            model_source = resolve_model_source(
+                local_model_dir, preferred_names=(model_family,)
+            )
+
+            # Load BLIP strictly from local files
+            captioner = BlipCaptioner.from_pretrained(
+                model_source=model_source,
+                device=device,
+                **load_kwargs,
+            )
+            _MODEL_CACHE[key] = captioner
+            return captioner
 
     # ------------------------------------------------------------
     # Future families go here
@@ -154,3 +237,10 @@ def get_model(settings: Any):
         "Supported families: ['blip']. "
         "If you add a new family, implement it here."
     )
+
+
+def clear_model_cache() -> None:
+    """Drop loaded models and resolved folders (tests, or after a re-download)."""
+    with _MODEL_CACHE_LOCK:
+        _MODEL_CACHE.clear()
+    _clear_resolved_sources()
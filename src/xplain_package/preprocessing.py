@@ -17,30 +17,57 @@ from __future__ import annotations
 
 import io
 from pathlib import Path
-from typing import Union
+from typing import TYPE_CHECKING, BinaryIO, Optional, Tuple, Union
 
-import numpy as np
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 
-# OpenCV is optional here, but safe to import because we use
-# opencv-python-headless in requirements.txt
-import cv2
+if TYPE_CHECKING:  # numpy is only needed by the cv2-style helpers below
+    import numpy as np
 
 
-def preprocess_image(image: Union[Image.Image, bytes, str, Path]) -> Image.Image:
+# What X-ray uploads almost always are. Passing them to Image.open skips
+# PIL's sniffing loop over every registered plugin; anything else still
+# opens through the full detection in _open_image.
+IMAGE_FORMATS = ("JPEG", "PNG")
+
+# Register the common plugins (JPEG, PNG, BMP, GIF, PPM) at import time,
+# so the first request does not pay for the plugin imports.
+Image.preinit()
+
+
+def _open_image(source) -> Image.Image:
+    """Image.open with the common formats tried first."""
+    try:
+        return Image.open(source, formats=IMAGE_FORMATS)
+    except UnidentifiedImageError:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return Image.open(source)
+
+
+def preprocess_image(
+    image: Union[Image.Image, bytes, memoryview, str, Path, BinaryIO],
+    draft_size: Optional[Tuple[int, int]] = None,
+) -> Image.Image:
     """
     Convert various input types into a clean PIL RGB image.
 
     Supported inputs:
     - PIL.Image.Image (already loaded)
-    - bytes (raw file bytes, e.g. UploadFile.read())
+    - bytes / bytearray / memoryview (raw file bytes, e.g. UploadFile.read())
     - str / Path (path to an image on disk)
+    - binary file object (e.g. UploadFile.file), read incrementally by PIL
 
     What we do:
     1) Load / decode image if needed
     2) Convert to RGB (BLIP expects 3 channels)
     3) Return PIL image (no resizing here)
 
+    draft_size=(width, height): for JPEG inputs, let libjpeg decode at a
+    reduced DCT scale (1/2, 1/4, 1/8) that is still >= draft_size.
+    Big X-rays are resized to the model size anyway, so this skips most
+    of the decode work. Other formats ignore it.
+
     We keep this minimal to stay robust if the model changes later.
     """
 
@@ -52,27 +79,48 @@ def preprocess_image(image: Union[Image.Image, bytes, str, Path]) -> Image.Image
 
     # ------------------------------------------------------------
     # 2) If input is raw bytes, decode with PIL
+    #    BytesIO(bytes) shares the bytes object (no copy); any other
+    #    buffer is copied once into it, so do NOT wrap bytes in a
+    #    memoryview first.
     # ------------------------------------------------------------
-    elif isinstance(image, (bytes, bytearray)):
-        pil_img = Image.open(io.BytesIO(image))
+    elif isinstance(image, (bytes, bytearray, memoryview)):
+        pil_img = _open_image(io.BytesIO(image))
 
     # ------------------------------------------------------------
-    # 3) If input is a path, load from disk
+    # 3) If input is a path, load from disk (PIL opens Path natively)
     # ------------------------------------------------------------
     elif isinstance(image, (str, Path)):
-        pil_img = Image.open(str(image))
+        pil_img = _open_image(image)
+
+    # ------------------------------------------------------------
+    # 4) If input is a file object, let PIL stream from it
+    #    (no full in-memory copy of the upload)
+    # ------------------------------------------------------------
+    elif hasattr(image, "read"):
+        pil_img = _open_image(image)
 
     else:
         raise TypeError(
             "preprocess_image received unsupported type. "
-            "Expected PIL.Image, bytes, str, or Path."
+            "Expected PIL.Image, bytes, memoryview, str, Path, or a binary file object."
         )
 
+    # ------------------------------------------------------------
+    # Reduced-size JPEG decode (must happen before any pixel access)
+    # ------------------------------------------------------------
+    if draft_size is not None and pil_img is not image:
+        pil_img.draft("RGB", draft_size)
+
     # ------------------------------------------------------------
     # Some X-rays are stored as grayscale ("L") or RGBA.
     # BLIP wants RGB, so we force conversion here.
+    # convert() always copies the pixel buffer, so RGB images skip it
+    # (decoded files are still loaded here, like convert() would).
     # ------------------------------------------------------------
-    pil_img = pil_img.convert("RGB")
+    if pil_img.mode != "RGB":
+        pil_img = pil_img.convert("RGB")
+    elif pil_img is not image:
+        pil_img.load()
 
     return pil_img
 
@@ -82,9 +130,13 @@ def pil_to_cv2(pil_img: Image.Image) -> np.ndarray:
     Utility: Convert PIL RGB image to OpenCV BGR numpy array.
 
     Not required by BLIP, but handy for future preprocessing.
+    A channel flip is all cv2.cvtColor(RGB2BGR) does, so numpy is enough
+    (no OpenCV import on the inference path).
     """
-    rgb = np.array(pil_img)
-    bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+    import numpy as np
+
+    rgb = np.asarray(pil_img.convert("RGB"))
+    bgr = np.ascontiguousarray(rgb[..., ::-1])
     return bgr
 
 
@@ -94,6 +146,8 @@ def cv2_to_pil(cv2_img: np.ndarray) -> Image.Image:
 
     Not required by BLIP, but handy for future preprocessing.
     """
-    rgb = cv2.cvtColor(cv2_img, cv2.COLOR_BGR2RGB)
+    import numpy as np
+
+    rgb = np.ascontiguousarray(cv2_img[..., ::-1])
     pil_img = Image.fromarray(rgb)
     return pil_img
@@ -1,19 +1,35 @@
 import logging
 import os
 
+# Shared by every handler (a Formatter is never mutated after creation)
+_FORMATTER = logging.Formatter(
+    "[%(levelname)s] %(asctime)s - %(name)s - %(message)s"
+)
+
+# Env vars do not change after start: read LOG_LEVEL once
+_DEFAULT_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Loggers that already have our handler, by name. Returned directly:
+# no logging.getLogger call (and no logging module lock) on repeat calls
+_INITIALIZED: dict = {}
+
+
 def get_logger(name: str, level: str = None) -> logging.Logger:
+    logger = _INITIALIZED.get(name)
+    if logger is not None:
+        return logger
+
     logger = logging.getLogger(name)
     if logger.handlers:
+        _INITIALIZED[name] = logger
         return logger  # avoid duplicate handlers in reloads
 
-    level = level or os.getenv("LOG_LEVEL", "INFO")
+    level = level or _DEFAULT_LEVEL
     logger.setLevel(level)
 
     ch = logging.StreamHandler()
     ch.setLevel(level)
-    formatter = logging.Formatter(
-        "[%(levelname)s] %(asctime)s - %(name)s - %(message)s"
-    )
-    ch.setFormatter(formatter)
+    ch.setFormatter(_FORMATTER)
     logger.addHandler(ch)
+    _INITIALIZED[name] = logger
     return logger
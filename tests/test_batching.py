@@ -0,0 +1,105 @@
+"""
+test_batching.py
+
+MicroBatcher (inference/batching.py) with predict_uncached stubbed out:
+no model is loaded, only the queueing logic is exercised.
+"""
+
+import asyncio
+
+import pytest
+
+# Importing any xplain_package module loads the package __init__ (torch)
+pytest.importorskip("torch")
+
+from xplain_package.inference import batching  # noqa: E402
+from xplain_package.inference.batching import MicroBatcher  # noqa: E402
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Caption = the input string upper-cased; records every batch."""
+    batches = []
+
+    def predict_uncached(images, digests):
+        batches.append(list(images))
+        return [img.upper() for img in images]
+
+    monkeypatch.setattr(batching, "predict_uncached", predict_uncached)
+    monkeypatch.setattr(batching, "read_and_hash", lambda image: (image, None))
+    monkeypatch.setattr(batching, "decode_image", lambda image: image)
+    return batches
+
+
+async def _submit_all(batcher: MicroBatcher, images):
+    await batcher.start()
+    try:
+        return await asyncio.gather(
+            *(batcher.submit(img) for img in images), return_exceptions=True
+        )
+    finally:
+        await batcher.stop()
+
+
+def test_each_request_gets_its_own_caption(fake_model):
+    images = [f"img{i}" for i in range(10)]
+    batcher = MicroBatcher(max_batch=4, max_wait_ms=50)
+
+    captions = asyncio.run(_submit_all(batcher, images))
+
+    assert captions == [img.upper() for img in images]
+    assert all(len(batch) <= 4 for batch in fake_model)
+    assert sorted(img for batch in fake_model for img in batch) == sorted(images)
+
+
+def test_concurrent_requests_are_coalesced(fake_model):
+    batcher = MicroBatcher(max_batch=8, max_wait_ms=200)
+
+    asyncio.run(_submit_all(batcher, [f"img{i}" for i in range(8)]))
+
+    assert len(fake_model) < 8
+
+
+def test_batch_failure_reaches_every_request(monkeypatch, fake_model):
+    def broken(images, digests):
+        raise RuntimeError("CUDA out of memory")
+
+    monkeypatch.setattr(batching, "predict_uncached", broken)
+    batcher = MicroBatcher(max_batch=4, max_wait_ms=50)
+
+    results = asyncio.run(_submit_all(batcher, ["a", "b", "c"]))
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_broken_upload_fails_only_its_request(monkeypatch, fake_model):
+    def decode_image(image):
+        if image == "broken":
+            raise ValueError("not an image")
+        return image
+
+    monkeypatch.setattr(batching, "decode_image", decode_image)
+    batcher = MicroBatcher(max_batch=4, max_wait_ms=50)
+
+    ok, bad = asyncio.run(_submit_all(batcher, ["fine", "broken"]))
+
+    assert ok == "FINE"
+    assert isinstance(bad, ValueError)
+    assert fake_model == [["fine"]]
+
+
+def test_cached_images_skip_the_queue(monkeypatch, fake_model):
+    monkeypatch.setattr(batching, "read_and_hash", lambda image: (image, image.encode()))
+    monkeypatch.setattr(batching, "caption_cache_key", lambda digest: ("k", digest))
+    monkeypatch.setattr(batching.caption_cache, "get", lambda key: "cached caption")
+    batcher = MicroBatcher(max_batch=4, max_wait_ms=50)
+
+    captions = asyncio.run(_submit_all(batcher, ["a", "b"]))
+
+    assert captions == ["cached caption", "cached caption"]
+    assert fake_model == []
+
+
+def test_submit_before_start_raises():
+    with pytest.raises(RuntimeError, match="start"):
+        asyncio.run(MicroBatcher().submit(b"x"))
@@ -0,0 +1,112 @@
+"""
+test_cache.py
+
+LRUCache + content_digest (inference/cache.py).
+"""
+
+import io
+import threading
+
+import pytest
+
+# Importing any xplain_package module loads the package __init__ (torch)
+pytest.importorskip("torch")
+
+from xplain_package.inference.cache import LRUCache, content_digest  # noqa: E402
+
+
+# ============================================================
+# LRUCache
+# ============================================================
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    # Touch "a": "b" becomes the oldest entry
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_put_overwrites_and_refreshes():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_lru_disabled_when_maxsize_zero():
+    cache = LRUCache(0)
+    cache.put("a", 1)
+
+    assert cache.get("a") is None
+    assert cache.get("a", "default") == "default"
+    assert len(cache) == 0
+
+
+def test_lru_clear():
+    cache = LRUCache(4)
+    cache.put("a", 1)
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.get("a") is None
+
+
+def test_lru_is_thread_safe():
+    cache = LRUCache(32)
+    errors = []
+
+    def worker(offset: int) -> None:
+        try:
+            for i in range(2000):
+                key = (offset + i) % 100
+                cache.put(key, key)
+                value = cache.get(key)
+                assert value is None or value == key
+        except Exception as e:  # pragma: no cover - only on failure
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n * 7,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(cache) <= 32
+
+
+# ============================================================
+# content_digest
+# ============================================================
+
+def test_content_digest_same_for_bytes_bytearray_memoryview():
+    data = b"\x89PNG fake image bytes" * 100
+
+    digest = content_digest(data)
+    assert len(digest) == 16
+    assert content_digest(bytearray(data)) == digest
+    assert content_digest(memoryview(data)) == digest
+    assert content_digest(data + b"!") != digest
+
+
+def test_content_digest_rewinds_file_objects():
+    data = b"x" * (3 * 64 * 1024 + 5)  # several hash chunks
+    f = io.BytesIO(data)
+
+    assert content_digest(f) == content_digest(data)
+
+    # Rewound: the upload can still be decoded afterwards
+    assert f.tell() == 0
+    assert f.read() == data
@@ -0,0 +1,107 @@
+"""
+test_cuda_graphs.py
+
+Safety checks around the graphed greedy decoder (inference/cuda_graphs.py
+and the load-time gate in inference/predict.py). Runs on CPU: the
+decoders are fakes, only the decision logic is exercised.
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# Importing any xplain_package module loads the package __init__ (torch)
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from xplain_package.inference import predict  # noqa: E402
+from xplain_package.inference.cuda_graphs import unsupported_generation_options  # noqa: E402
+
+EOS = 102
+
+
+# ============================================================
+# Options the graphed loop cannot apply
+# ============================================================
+
+def test_default_generation_config_is_supported():
+    model = SimpleNamespace(generation_config=transformers.GenerationConfig())
+
+    assert unsupported_generation_options(model) == []
+
+
+def test_model_without_generation_config_is_supported():
+    assert unsupported_generation_options(SimpleNamespace()) == []
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"repetition_penalty": 1.2},
+        {"no_repeat_ngram_size": 3},
+        {"min_length": 5},
+        {"bad_words_ids": [[7]]},
+        {"suppress_tokens": [1, 2]},
+    ],
+)
+def test_logits_processors_are_refused(options):
+    model = SimpleNamespace(generation_config=transformers.GenerationConfig(**options))
+
+    unsupported = unsupported_generation_options(model)
+    assert len(unsupported) == 1
+    assert unsupported[0].startswith(next(iter(options)))
+
+
+# ============================================================
+# Load-time parity + speed gate
+# ============================================================
+
+@pytest.fixture
+def gate(monkeypatch):
+    """_graphed_decoder_pays_off on CPU with a fake decoder / generate."""
+    monkeypatch.setattr(torch.cuda, "synchronize", lambda device=None: None)
+
+    def run(graphed_ids, eager_ids, graphed_delay=0.0, eager_delay=0.0):
+        def graphed(pixel_values):
+            time.sleep(graphed_delay)
+            if isinstance(graphed_ids, Exception):
+                raise graphed_ids
+            return torch.tensor([graphed_ids])
+
+        def gen_fast(pixel_values):
+            time.sleep(eager_delay)
+            return torch.tensor([eager_ids])
+
+        decoder = SimpleNamespace(generate=graphed, eos_token_id=EOS)
+        return predict._graphed_decoder_pays_off(
+            decoder,
+            gen_fast,
+            pipeline=lambda images: torch.zeros((len(images), 3, 8, 8)),
+            image_size=(8, 8),
+            device=torch.device("cpu"),
+            dtype=torch.float32,
+        )
+
+    return run
+
+
+def test_same_tokens_and_faster_enables_graph(gate):
+    assert gate([30522, 5, 6, EOS], [30522, 5, 6, EOS], eager_delay=0.01)
+
+
+def test_padding_after_eos_is_ignored(gate):
+    # generate() pads finished sequences; the graphed loop keeps going
+    assert gate([30522, 5, EOS, 9, 9], [30522, 5, EOS, 0, 0], eager_delay=0.01)
+
+
+def test_different_tokens_disable_graph(gate):
+    assert not gate([30522, 5, 7, EOS], [30522, 5, 6, EOS], eager_delay=0.01)
+
+
+def test_slower_graph_is_disabled(gate):
+    assert not gate([30522, 5, EOS], [30522, 5, EOS], graphed_delay=0.01)
+
+
+def test_failing_graph_is_disabled(gate):
+    assert not gate(RuntimeError("capture failed"), [30522, 5, EOS])
@@ -0,0 +1,194 @@
+"""
+test_gcs.py
+
+io/gcs.py without network: skip-download manifest + size / CRC32C checks.
+"""
+
+import base64
+import json
+from types import SimpleNamespace
+
+import pytest
+
+# Importing any xplain_package module loads the package __init__ (torch)
+torch = pytest.importorskip("torch")
+safetensors_torch = pytest.importorskip("safetensors.torch")
+google_crc32c = pytest.importorskip("google_crc32c")
+pytest.importorskip("google.cloud.storage")
+
+from xplain_package.io import gcs  # noqa: E402
+from xplain_package.models.blip import clear_model_cache  # noqa: E402
+
+
+def _crc32c(data: bytes) -> str:
+    """Base64 CRC32C, same encoding as blob.crc32c."""
+    return base64.b64encode(google_crc32c.Checksum(data).digest()).decode("ascii")
+
+
+def _blob(name: str, data: bytes, generation: int = 1):
+    """The blob attributes the manifest uses."""
+    return SimpleNamespace(name=name, crc32c=_crc32c(data), size=len(data), generation=generation)
+
+
+@pytest.fixture
+def downloaded(tmp_path):
+    """A folder as left by a successful download_prefix()."""
+    files = {"config.json": b"{}", "model.safetensors": b"w" * 1000}
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+
+    blobs = [_blob(f"models/blip/{name}", data) for name, data in files.items()]
+    remote = gcs._remote_manifest(blobs, "models/blip")
+    (tmp_path / gcs.MANIFEST_NAME).write_text(json.dumps(remote))
+    return tmp_path, remote
+
+
+# ============================================================
+# Manifest
+# ============================================================
+
+def test_remote_manifest_uses_relative_names():
+    blobs = [_blob("models/blip/config.json", b"{}"), _blob("models/blip/sub/vocab.txt", b"a")]
+    manifest = gcs._remote_manifest(blobs, "models/blip")
+
+    assert set(manifest) == {"config.json", "sub/vocab.txt"}
+    assert manifest["config.json"]["size"] == 2
+
+
+def test_up_to_date_folder_is_skipped(downloaded):
+    dest_dir, remote = downloaded
+
+    assert gcs.is_up_to_date(dest_dir, remote)
+
+
+def test_missing_manifest_means_download(downloaded):
+    dest_dir, remote = downloaded
+    (dest_dir / gcs.MANIFEST_NAME).unlink()
+
+    assert not gcs.is_up_to_date(dest_dir, remote)
+
+
+def test_new_generation_in_bucket_means_download(downloaded):
+    dest_dir, remote = downloaded
+    changed = json.loads(json.dumps(remote))
+    changed["model.safetensors"]["generation"] = 2
+
+    assert not gcs.is_up_to_date(dest_dir, changed)
+
+
+def test_truncated_file_means_download(downloaded):
+    dest_dir, remote = downloaded
+    (dest_dir / "model.safetensors").write_bytes(b"w" * 10)
+
+    assert not gcs.is_up_to_date(dest_dir, remote)
+
+
+def test_corrupted_file_same_size_means_download(downloaded):
+    dest_dir, remote = downloaded
+    (dest_dir / "model.safetensors").write_bytes(b"x" * 1000)
+
+    assert not gcs.is_up_to_date(dest_dir, remote)
+
+
+def test_unreadable_manifest_means_download(downloaded):
+    dest_dir, remote = downloaded
+    (dest_dir / gcs.MANIFEST_NAME).write_text("{not json")
+
+    assert not gcs.is_up_to_date(dest_dir, remote)
+
+
+# ============================================================
+# XPLAIN_MODEL_FILES / XPLAIN_SKIP_DIRS (default patterns)
+# ============================================================
+
+PREFIX = "models/blip"
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "models/blip/config.json",
+        "models/blip/vocab.txt",
+        "models/blip/model.safetensors",
+        "models/blip/model-00001-of-00002.safetensors",
+        "models/blip/pytorch_model.bin",
+        "models/blip/pytorch_model-00001-of-00002.bin",
+        "models/blip/spiece.model",
+        "models/blip/cxiu_blip_baseline/config.json",
+    ],
+)
+def test_inference_files_are_downloaded(name):
+    assert gcs._is_model_file(name, PREFIX)
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "models/blip/optimizer.pt",
+        "models/blip/scheduler.pt",
+        "models/blip/rng_state.pth",
+        "models/blip/training_args.bin",
+        "models/blip/checkpoint-500/model.safetensors",
+        "models/blip/checkpoint-500/config.json",
+        "models/blip/cxiu_blip_baseline/checkpoint-1000/pytorch_model.bin",
+    ],
+)
+def test_training_artifacts_are_skipped(name):
+    assert not gcs._is_model_file(name, PREFIX)
+
+
+def test_prefix_itself_may_be_a_checkpoint():
+    # Only folders BELOW the prefix are judged
+    assert gcs._is_model_file("runs/checkpoint-500/config.json", "runs/checkpoint-500")
+
+
+def test_custom_allowlist(monkeypatch):
+    monkeypatch.setattr(gcs, "MODEL_FILES", ["*"])
+    monkeypatch.setattr(gcs, "SKIP_DIRS", [])
+
+    assert gcs._is_model_file("models/blip/optimizer.pt", PREFIX)
+    assert gcs._is_model_file("models/blip/checkpoint-500/config.json", PREFIX)
+
+
+def test_listing_keeps_only_model_files():
+    names = [
+        "models/blip/config.json",
+        "models/blip/model.safetensors",
+        "models/blip/optimizer.pt",
+        "models/blip/checkpoint-500/model.safetensors",
+    ]
+    client = SimpleNamespace(
+        bucket=lambda name: name,
+        list_blobs=lambda bucket, prefix: [_blob(name, b"x") for name in names],
+    )
+
+    kept = gcs.list_prefix(client, "bucket", PREFIX)
+
+    assert [blob.name for blob in kept] == names[:2]
+
+
+# ============================================================
+# pytorch_model.bin -> model.safetensors
+# ============================================================
+
+def test_conversion_runs_on_the_resolved_model_folder(tmp_path):
+    # LOCAL_MODEL_DIR is the parent: the model sits one level down
+    model_dir = tmp_path / "cxiu_blip_baseline"
+    model_dir.mkdir()
+    (model_dir / "config.json").write_text("{}")
+    weight = torch.arange(6.0).reshape(2, 3)
+    torch.save({"weight": weight, "tied": weight}, model_dir / "pytorch_model.bin")
+
+    clear_model_cache()
+    try:
+        assert gcs.convert_model_folder(tmp_path)
+    finally:
+        clear_model_cache()
+
+    tensors = safetensors_torch.load_file(str(model_dir / "model.safetensors"))
+    assert torch.equal(tensors["weight"], weight)
+    assert torch.equal(tensors["tied"], weight)
+    assert not (tmp_path / "model.safetensors").exists()
+
+    # Second start: nothing left to convert
+    assert not gcs.convert_to_safetensors(model_dir)
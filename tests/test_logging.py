@@ -0,0 +1,45 @@
+"""
+test_logging.py
+
+get_logger (utils/logging.py): one handler per name, cached loggers.
+"""
+
+import logging
+
+import pytest
+
+# Importing any xplain_package module loads the package __init__ (torch)
+pytest.importorskip("torch")
+
+from xplain_package.utils.logging import get_logger  # noqa: E402
+
+
+def test_one_handler_per_logger():
+    logger = get_logger("xplain_test.handlers")
+    get_logger("xplain_test.handlers")
+
+    assert len(logger.handlers) == 1
+
+
+def test_repeat_calls_skip_the_logging_module(monkeypatch):
+    logger = get_logger("xplain_test.cached")
+
+    requested = []
+    get_logger_orig = logging.getLogger
+
+    def spy(name=None):
+        requested.append(name)
+        return get_logger_orig(name)
+
+    monkeypatch.setattr(logging, "getLogger", spy)
+
+    assert get_logger("xplain_test.cached") is logger
+    assert "xplain_test.cached" not in requested
+
+
+def test_existing_handlers_are_kept():
+    existing = logging.getLogger("xplain_test.existing")
+    existing.addHandler(logging.NullHandler())
+
+    assert get_logger("xplain_test.existing") is existing
+    assert len(existing.handlers) == 1
@@ -0,0 +1,220 @@
+"""
+test_predict.py
+
+predict_captions (inference/predict.py) around a fake model: caption
+cache, in-batch dedupe and the pixel cache. No weights are loaded.
+"""
+
+import asyncio
+import dataclasses
+import io
+from types import SimpleNamespace
+
+import pytest
+
+# Importing any xplain_package module loads the package __init__ (torch)
+torch = pytest.importorskip("torch")
+
+from PIL import Image  # noqa: E402
+
+from xplain_package.data.transforms import TensorImagePipeline  # noqa: E402
+from xplain_package.inference import predict  # noqa: E402
+from xplain_package.inference.batching import MicroBatcher  # noqa: E402
+from xplain_package.models import registry  # noqa: E402
+
+
+def _png(value: int) -> bytes:
+    """A small solid-gray PNG upload."""
+    buf = io.BytesIO()
+    Image.new("RGB", (16, 12), (value, value, value)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """
+    Publish a fake "loaded" model: generate returns the mean pixel value
+    of each image, decode formats it. Returns the list of pixel_values
+    batches passed to generate.
+    """
+    calls = []
+
+    def gen_fast(pixel_values):
+        calls.append(pixel_values.clone())
+        return pixel_values.mean(dim=(1, 2, 3))
+
+    def decode(ids):
+        return [f" {float(v):.4f} " for v in ids]
+
+    loaded = {
+        "_MODEL": object(),
+        "_PIPELINE": TensorImagePipeline(size=(8, 8), mean=(0.5,) * 3, std=(0.5,) * 3),
+        "_DEVICE": torch.device("cpu"),
+        "_DTYPE": torch.float32,
+        "_GEN_FAST": gen_fast,
+        "_DECODE": decode,
+        "_CACHE_CAPTIONS": True,
+    }
+    for name, value in loaded.items():
+        monkeypatch.setattr(predict, name, value)
+
+    # The real caches (also imported by the batcher), emptied around each test
+    predict.caption_cache.clear()
+    predict.pixel_cache.clear()
+    yield calls
+    predict.caption_cache.clear()
+    predict.pixel_cache.clear()
+
+
+def _generated(calls) -> int:
+    """Number of images that went through generate."""
+    return sum(len(batch) for batch in calls)
+
+
+# ============================================================
+# Caption cache + in-batch dedupe
+# ============================================================
+
+def test_identical_uploads_in_one_batch_run_once(fake_model):
+    a, b = _png(10), _png(200)
+
+    texts = predict.predict_captions([a, b, a, io.BytesIO(a)])
+
+    assert texts[0] == texts[2] == texts[3] != texts[1]
+    assert _generated(fake_model) == 2
+
+
+def test_repeated_upload_is_served_from_caption_cache(fake_model):
+    a = _png(10)
+
+    first = predict.predict_caption(a)
+    second = predict.predict_caption(memoryview(a))
+
+    assert first == second == first.strip()
+    assert _generated(fake_model) == 1
+
+
+def test_pil_images_are_never_cached(fake_model):
+    img = Image.new("RGB", (16, 12), (10, 10, 10))
+
+    predict.predict_captions([img, img])
+    predict.predict_caption(img)
+
+    assert _generated(fake_model) == 3
+    assert len(predict.caption_cache) == 0
+
+
+def test_sampled_captions_are_not_cached(monkeypatch, fake_model):
+    monkeypatch.setattr(predict, "_CACHE_CAPTIONS", False)
+    a = _png(10)
+
+    predict.predict_caption(a)
+    predict.predict_caption(a)
+
+    assert _generated(fake_model) == 2
+    assert len(predict.caption_cache) == 0
+
+
+# ============================================================
+# Pixel cache (re-uploads whose caption is not cached)
+# ============================================================
+
+@pytest.fixture
+def decoded(monkeypatch):
+    """Sampling mode (no caption cache) + a log of preprocess_image calls."""
+    monkeypatch.setattr(predict, "_CACHE_CAPTIONS", False)
+    calls = []
+    preprocess_image = predict.preprocess_image
+
+    def counting(image, **kwargs):
+        calls.append(image)
+        return preprocess_image(image, **kwargs)
+
+    monkeypatch.setattr(predict, "preprocess_image", counting)
+    return calls
+
+
+def test_repeated_upload_skips_preprocess(fake_model, decoded):
+    a = _png(10)
+
+    predict.predict_caption(a)
+    predict.predict_caption(io.BytesIO(a))
+
+    assert len(decoded) == 1
+    torch.testing.assert_close(fake_model[0], fake_model[1])
+
+
+def test_cached_and_fresh_pixels_keep_batch_order(fake_model, decoded):
+    a, b, c = _png(10), _png(120), _png(240)
+    expected = predict.predict_captions([b, a, c])
+    fake_model.clear()
+    decoded.clear()
+    predict.pixel_cache.clear()
+
+    # a is cached, b and c are decoded: the merged batch keeps positions
+    predict.predict_caption(a)
+    assert predict.predict_captions([b, a, c]) == expected
+    assert len(decoded) == 3
+
+
+def test_batcher_repeated_upload_skips_preprocess(fake_model, decoded):
+    a = _png(10)
+
+    async def run():
+        batcher = MicroBatcher(max_batch=4, max_wait_ms=1)
+        await batcher.start()
+        try:
+            first = await batcher.submit(a)
+            calls = len(decoded)
+            second = await batcher.submit(a)
+            return first, second, calls
+        finally:
+            await batcher.stop()
+
+    first, second, calls_after_first = asyncio.run(run())
+
+    assert first == second
+    assert len(decoded) == calls_after_first
+    assert _generated(fake_model) == 2
+
+
+# ============================================================
+# load_captioner
+# ============================================================
+
+def test_unknown_backend_fails_before_model_load(monkeypatch):
+    loads = []
+    monkeypatch.setattr(predict, "_MODEL", None)
+    monkeypatch.setattr(predict, "settings", dataclasses.replace(predict.settings, BACKEND="tensorrtt"))
+    monkeypatch.setattr(predict, "get_model", lambda settings: loads.append(settings))
+
+    with pytest.raises(ValueError, match="Unknown BACKEND"):
+        predict.load_captioner()
+    assert loads == []
+
+
+def test_failed_load_evicts_the_cached_model(monkeypatch):
+    captioner = SimpleNamespace(
+        model=SimpleNamespace(dtype=torch.float32, eval=lambda: None),
+        processor=None,
+        device=torch.device("cpu"),
+        pipeline=None,
+    )
+
+    def get_model(settings):
+        registry._MODEL_CACHE["test"] = captioner
+        return captioner
+
+    def broken(processor):
+        raise RuntimeError("engine build failed")
+
+    monkeypatch.setattr(predict, "_MODEL", None)
+    monkeypatch.setattr(predict, "get_model", get_model)
+    monkeypatch.setattr(predict, "_processor_image_size", broken)
+
+    with pytest.raises(RuntimeError, match="engine build failed"):
+        predict.load_captioner()
+
+    # A retry must load fresh weights, not the half-converted model
+    assert "test" not in registry._MODEL_CACHE
+    assert not predict.is_loaded()
@@ -0,0 +1,80 @@
+"""
+test_preprocessing.py
+
+preprocess_image (preprocessing.py): input types, draft_size, format fallback.
+"""
+
+import io
+
+import pytest
+
+# Importing any xplain_package module loads the package __init__ (torch)
+pytest.importorskip("torch")
+
+from PIL import Image  # noqa: E402
+
+from xplain_package.preprocessing import preprocess_image  # noqa: E402
+
+
+def _encode(img: Image.Image, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def test_grayscale_png_becomes_rgb():
+    data = _encode(Image.linear_gradient("L"), "PNG")
+
+    img = preprocess_image(data)
+    assert img.mode == "RGB"
+    assert img.size == (256, 256)
+
+
+def test_bytes_memoryview_and_file_object_agree():
+    data = _encode(Image.new("RGB", (32, 16), (10, 20, 30)), "PNG")
+
+    expected = preprocess_image(data).tobytes()
+    assert preprocess_image(memoryview(data)).tobytes() == expected
+    assert preprocess_image(io.BytesIO(data)).tobytes() == expected
+
+
+def test_path_input(tmp_path):
+    path = tmp_path / "xray.png"
+    Image.new("L", (8, 8), 128).save(path)
+
+    assert preprocess_image(path).mode == "RGB"
+    assert preprocess_image(str(path)).size == (8, 8)
+
+
+def test_rgb_pil_image_is_not_copied():
+    img = Image.new("RGB", (4, 4))
+
+    assert preprocess_image(img) is img
+
+
+def test_draft_size_reduces_jpeg_decode():
+    data = _encode(Image.new("RGB", (1024, 1024), (200, 100, 50)), "JPEG")
+
+    # libjpeg picks the smallest DCT scale still >= the requested size
+    img = preprocess_image(data, draft_size=(384, 384))
+    assert img.size == (512, 512)
+    assert preprocess_image(data).size == (1024, 1024)
+
+
+def test_draft_size_ignored_for_png():
+    data = _encode(Image.new("RGB", (1024, 1024)), "PNG")
+
+    assert preprocess_image(data, draft_size=(384, 384)).size == (1024, 1024)
+
+
+def test_other_formats_fall_back_to_full_detection():
+    # BMP is outside IMAGE_FORMATS: the first Image.open fails, the second sniffs
+    data = _encode(Image.new("RGB", (8, 8), (1, 2, 3)), "BMP")
+
+    img = preprocess_image(io.BytesIO(data))
+    assert img.getpixel((0, 0)) == (1, 2, 3)
+
+
+def test_unsupported_type_raises():
+    with pytest.raises(TypeError):
+        preprocess_image(12345)
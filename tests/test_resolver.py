@@ -0,0 +1,100 @@
+"""
+test_resolver.py
+
+Local model folder resolution (models/blip.py resolve_model_source).
+"""
+
+import pytest
+
+# Importing any xplain_package module loads the package __init__ (torch)
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from xplain_package.models.blip import clear_model_cache, resolve_model_source  # noqa: E402
+
+
+def _model_folder(path):
+    """Create a folder that looks like a save_pretrained(...) output."""
+    path.mkdir(parents=True)
+    (path / "config.json").write_text("{}")
+    return path
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    # Results are memoized per folder: every test starts clean
+    clear_model_cache()
+    yield
+    clear_model_cache()
+
+
+def test_exact_model_folder(tmp_path):
+    model_dir = _model_folder(tmp_path / "blip_model")
+
+    assert resolve_model_source(str(model_dir)) == str(model_dir)
+
+
+def test_single_child_folder(tmp_path):
+    model_dir = _model_folder(tmp_path / "cxiu_blip_baseline")
+    (tmp_path / "not_a_model").mkdir()
+    (tmp_path / "notes.txt").write_text("hello")
+
+    assert resolve_model_source(str(tmp_path)) == str(model_dir)
+
+
+def test_directory_named_config_json_is_not_a_model(tmp_path):
+    (tmp_path / "fake" / "config.json").mkdir(parents=True)
+    model_dir = _model_folder(tmp_path / "real")
+
+    assert resolve_model_source(str(tmp_path)) == str(model_dir)
+
+
+def test_preferred_name_wins_without_ambiguity_error(tmp_path):
+    _model_folder(tmp_path / "other_variant")
+    preferred = _model_folder(tmp_path / "blip")
+
+    assert resolve_model_source(str(tmp_path), preferred_names=("blip",)) == str(preferred)
+
+
+def test_ambiguous_children_raise(tmp_path):
+    _model_folder(tmp_path / "variant_a")
+    _model_folder(tmp_path / "variant_b")
+
+    with pytest.raises(RuntimeError, match="Multiple pretrained model folders"):
+        resolve_model_source(str(tmp_path))
+
+
+def test_none_found_raises(tmp_path):
+    (tmp_path / "empty_child").mkdir()
+
+    with pytest.raises(FileNotFoundError, match="No valid local pretrained model"):
+        resolve_model_source(str(tmp_path))
+
+    with pytest.raises(FileNotFoundError):
+        resolve_model_source(str(tmp_path / "missing"))
+
+
+def test_empty_dir_setting_raises():
+    with pytest.raises(FileNotFoundError, match="LOCAL_MODEL_DIR is empty"):
+        resolve_model_source("")
+
+
+def test_hf_model_name_does_not_split_the_cache(tmp_path):
+    model_dir = _model_folder(tmp_path / "only")
+
+    assert resolve_model_source(str(tmp_path)) == str(model_dir)
+    assert resolve_model_source(str(tmp_path), "Salesforce/blip") == str(model_dir)
+
+
+def test_clear_model_cache_forgets_results(tmp_path):
+    _model_folder(tmp_path / "variant_a")
+    first = resolve_model_source(str(tmp_path))
+
+    # A second model appears: the memoized answer is still returned...
+    _model_folder(tmp_path / "variant_b")
+    assert resolve_model_source(str(tmp_path)) == first
+
+    # ...until the cache is cleared
+    clear_model_cache()
+    with pytest.raises(RuntimeError):
+        resolve_model_source(str(tmp_path))
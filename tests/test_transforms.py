@@ -0,0 +1,105 @@
+"""
+test_transforms.py
+
+TensorImagePipeline (data/transforms.py) against the HF BLIP image processor.
+"""
+
+import numpy as np
+import pytest
+
+# Importing any xplain_package module loads the package __init__ (torch)
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from PIL import Image  # noqa: E402
+
+from xplain_package.data.transforms import TensorImagePipeline  # noqa: E402
+
+# The PIL-based processor is the reference (newer transformers versions
+# split it out of BlipImageProcessor)
+BlipImageProcessor = getattr(
+    transformers, "BlipImageProcessorPil", transformers.BlipImageProcessor
+)
+
+
+@pytest.fixture(scope="module")
+def processor():
+    # BLIP defaults: 384x384 bicubic, CLIP mean / std (nothing downloaded)
+    return BlipImageProcessor()
+
+
+def _reference(processor, images):
+    return processor(images=images, return_tensors="pt")["pixel_values"]
+
+
+def _smooth_images():
+    """X-ray-like inputs: grayscale gradients of various sizes."""
+    gradient = Image.linear_gradient("L")
+    return [
+        gradient.resize((500, 300)).convert("RGB"),
+        gradient.resize((1000, 800)).rotate(30).convert("RGB"),
+        Image.new("RGB", (384, 384), (10, 200, 30)),
+    ]
+
+
+def test_torch_path_matches_processor(processor):
+    images = _smooth_images()
+    pipeline = TensorImagePipeline.from_processor(processor)
+
+    out = pipeline(images)
+    ref = _reference(processor, images)
+
+    assert out.shape == ref.shape == (3, 3, 384, 384)
+    assert out.dtype == torch.float32
+
+    # Same up to resampling rounding (1 uint8 level ~ 0.015 after normalize)
+    diff = (out - ref).abs()
+    assert diff.mean() < 5e-3
+    assert diff.max() < 0.2
+
+
+def test_torch_path_exact_without_resize(processor):
+    rng = np.random.default_rng(0)
+    images = [Image.fromarray(rng.integers(0, 256, (384, 384, 3), dtype=np.uint8))]
+    pipeline = TensorImagePipeline.from_processor(processor)
+
+    torch.testing.assert_close(pipeline(images), _reference(processor, images), atol=1e-5, rtol=0)
+
+
+def test_mixed_sizes_keep_batch_order(processor):
+    images = _smooth_images()
+    pipeline = TensorImagePipeline.from_processor(processor)
+
+    batch = pipeline(images)
+    for i, img in enumerate(images):
+        torch.testing.assert_close(batch[i], pipeline([img])[0])
+
+
+# ============================================================
+# CPU fast path (fused Numba kernel, data/_fast.py)
+# ============================================================
+
+def test_fast_cpu_path_matches_processor(processor):
+    rng = np.random.default_rng(1)
+    images = _smooth_images() + [
+        Image.fromarray(rng.integers(0, 256, (200, 300, 3), dtype=np.uint8))
+    ]
+    pipeline = TensorImagePipeline.from_processor(processor, fast_cpu=True)
+
+    # Same PIL uint8 resize as HF, so the results match exactly
+    torch.testing.assert_close(pipeline(images), _reference(processor, images), atol=1e-5, rtol=0)
+
+
+def test_normalize_kernel_matches_numpy():
+    from xplain_package.data._fast import normalize_u8_to_f32
+
+    rng = np.random.default_rng(2)
+    arr = rng.integers(0, 256, (17, 23, 3), dtype=np.uint8)
+    scale = np.array([0.01, 0.02, 0.03], dtype=np.float32)
+    shift = np.array([-1.0, 0.5, 2.0], dtype=np.float32)
+    out = np.empty((3, 17, 23), dtype=np.float32)
+
+    normalize_u8_to_f32(arr, scale, shift, out)
+
+    expected = arr.transpose(2, 0, 1) * scale[:, None, None] + shift[:, None, None]
+    np.testing.assert_allclose(out, expected, rtol=1e-6, atol=1e-6)
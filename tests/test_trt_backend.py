@@ -0,0 +1,73 @@
+"""
+test_trt_backend.py
+
+TensorRT engine cache (inference/trt_backend.py) without TensorRT:
+export and trtexec are stubbed, only the file handling is exercised.
+"""
+
+import os
+
+import pytest
+
+# Importing any xplain_package module loads the package __init__ (torch)
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from xplain_package.inference import trt_backend  # noqa: E402
+
+
+@pytest.fixture
+def fake_build(monkeypatch):
+    """Stub export + trtexec; returns the engine paths trtexec wrote to."""
+    written = []
+
+    def export(vision_model, onnx_path, image_size):
+        with open(onnx_path, "w") as f:
+            f.write("onnx")
+
+    def build(onnx_path, engine_path, image_size, max_batch):
+        written.append(engine_path)
+        with open(engine_path, "w") as f:
+            f.write("engine")
+
+    monkeypatch.setattr(trt_backend, "_export_onnx", export)
+    monkeypatch.setattr(trt_backend, "_build_engine", build)
+    return written
+
+
+def test_engine_is_renamed_into_place(tmp_path, fake_build):
+    engine_path = str(tmp_path / "blip_vision.plan")
+
+    trt_backend._build_engine_file(None, engine_path, (384, 384), 4)
+
+    # trtexec wrote a temp file, never the final path
+    assert fake_build and fake_build[0] != engine_path
+    assert open(engine_path).read() == "engine"
+    assert sorted(os.listdir(tmp_path)) == ["blip_vision.plan"]
+
+
+def test_failed_build_leaves_no_engine(tmp_path, monkeypatch, fake_build):
+    def broken(onnx_path, engine_path, image_size, max_batch):
+        with open(engine_path, "w") as f:
+            f.write("half an eng")
+        raise trt_backend.ModelLoadError("trtexec failed")
+
+    monkeypatch.setattr(trt_backend, "_build_engine", broken)
+    engine_path = str(tmp_path / "blip_vision.plan")
+
+    with pytest.raises(trt_backend.ModelLoadError):
+        trt_backend._build_engine_file(None, engine_path, (384, 384), 4)
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_model_identity_follows_the_weights(tmp_path):
+    (tmp_path / "config.json").write_text("{}")
+    weights = tmp_path / "model.safetensors"
+    weights.write_bytes(b"w" * 10)
+
+    first = trt_backend.model_identity(str(tmp_path))
+    assert trt_backend.model_identity(str(tmp_path)) == first
+
+    weights.write_bytes(b"w" * 11)
+    assert trt_backend.model_identity(str(tmp_path)) != first